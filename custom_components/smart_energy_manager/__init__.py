@@ -188,7 +188,7 @@ def _register_event_listeners(
             return
         try:
             now = dt_util.now()
-            deficit = planner.compute_energy_deficit(now=now)
+            deficit = planner.planning_snapshot(now=now).deficit
             schedule = planner.plan_charging(now=now)
             overnight = planner.last_overnight_need
             await state_machine.async_on_plan(schedule)
@@ -286,7 +286,10 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id, None)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id, None)
+        if coordinator is not None:
+            # Write out any delayed save so a reload loads current data
+            await coordinator.store.async_save()
     return unload_ok
 
 
@@ -5,6 +5,8 @@ No Home Assistant dependencies — fully unit-testable.
 
 from __future__ import annotations
 
+from collections.abc import Sequence
+
 
 class ConsumptionTracker:
     """Tracks daily consumption using a sliding window average."""
@@ -23,7 +25,7 @@ class ConsumptionTracker:
         """Set the fallback consumption value."""
         self._fallback_kwh = value
 
-    def average(self, history: list[float]) -> float:
+    def average(self, history: Sequence[float]) -> float:
         """Compute the sliding window average consumption.
 
         Args:
@@ -37,7 +39,7 @@ class ConsumptionTracker:
             return self._fallback_kwh
         return round(sum(values) / len(values), 2)
 
-    def add_entry(self, history: list[float], value: float) -> list[float]:
+    def add_entry(self, history: Sequence[float], value: float) -> list[float]:
         """Add a new daily value to the front of history, trimming to window size.
 
         Args:
@@ -49,18 +51,18 @@ class ConsumptionTracker:
         """
         if value <= 0:
             return list(history)
-        return [round(value, 2)] + history[: self._window_days - 1]
+        return [round(value, 2), *history[: self._window_days - 1]]
 
     @property
     def window_days(self) -> int:
         """Return the window size."""
         return self._window_days
 
-    def days_tracked(self, history: list[float]) -> int:
+    def days_tracked(self, history: Sequence[float]) -> int:
         """Return the number of valid entries in history."""
         return len([v for v in history[: self._window_days] if v > 0])
 
-    def source(self, history: list[float]) -> str:
+    def source(self, history: Sequence[float]) -> str:
         """Return whether the average comes from 'sliding_window' or 'fallback'."""
         values = [v for v in history[: self._window_days] if v > 0]
         return "sliding_window" if values else "fallback"
@@ -6,7 +6,8 @@ Central hub that holds all sub-components and recomputes derived values.
 from __future__ import annotations
 
 import logging
-from datetime import timedelta
+from datetime import date, timedelta
+from operator import is_
 from typing import TYPE_CHECKING, Any
 
 from homeassistant.config_entries import ConfigEntry
@@ -22,7 +23,6 @@ if TYPE_CHECKING:
     from .surplus_controller import SurplusLoadController
 
 from .const import (
-    BMS_CAPACITY_HISTORY_DAYS,
     CONF_BATTERY_CAPACITY,
     CONF_CHARGING_EFFICIENCY,
     CONF_CONSUMPTION_SENSOR,
@@ -60,21 +60,25 @@ from .const import (
     DEFAULT_WINDOW_END_HOUR,
     DEFAULT_WINDOW_START_HOUR,
     DOMAIN,
-    MORNING_SOC_HISTORY_DAYS,
     SENSOR_UNAVAILABLE_TICKS,
-    SESSION_COST_HISTORY_DAYS,
-    SURPLUS_RUNTIME_HISTORY_DAYS,
     UPDATE_INTERVAL_SECONDS,
 )
 from .consumption_tracker import ConsumptionTracker
 from .forecast_corrector import ForecastCorrector
 from .models import ChargingSchedule, ChargingSession, ChargingState, OvernightNeed
-from .price_analyzer import PriceAnalyzer
+from .price_analyzer import PriceAnalyzer, PriceSlot
 from .storage import SmartBatteryStore
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _dense_hourly(hourly: dict[int, float]) -> list[float]:
+    """Expand a sparse {hour: kWh} forecast into 24 values (empty if no data)."""
+    if not hourly:
+        return []
+    return [hourly.get(h, 0.0) for h in range(24)]
+
+
 class SmartBatteryCoordinator(DataUpdateCoordinator[dict[str, Any]]):
     """Coordinator that recomputes all derived sensor values."""
 
@@ -112,6 +116,17 @@ class SmartBatteryCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         self.current_schedule: ChargingSchedule | None = None
         self._last_overnight: OvernightNeed | None = None
 
+        # Parsed price sensor attributes, rebuilt when the sensor updates
+        self._price_index: dict[str, dict[int, list[float]]] = {}
+        self._price_index_stamp: Any = None
+        self._price_views_cache: tuple[dict, tuple[str, str], tuple] | None = None
+
+        # Dense hourly solar forecasts per day, keyed on the wh_period dicts used
+        self._solar_hourly_cache: dict[date, tuple[list[dict], list[float]]] = {}
+
+        # Averages of forecast_error_history, refreshed when a new error is recorded
+        self._forecast_error_stats: tuple[float, float] | None = None
+
         # Phase 2 components (set from __init__.py after construction)
         self.inverter: InverterController | None = None
         self.state_machine: ChargingStateMachine | None = None
@@ -262,13 +277,6 @@ class SmartBatteryCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         price_entity = self.entry.data.get(CONF_PRICE_SENSOR, "")
         return self.soc_sensor_available and self._is_sensor_available(price_entity)
 
-    def _get_state_attrs(self, entity_id: str) -> dict[str, Any]:
-        """Get attributes dict from a HA entity."""
-        state = self.hass.states.get(entity_id)
-        if state is None:
-            return {}
-        return dict(state.attributes)
-
     def _sum_sensor_states(self, entity_ids: list[str]) -> float:
         """Sum the float states of multiple sensors."""
         return sum(self._get_state_float(eid) for eid in entity_ids)
@@ -333,10 +341,54 @@ class SmartBatteryCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         """Current electricity price."""
         return self._get_state_float(self.entry.data.get(CONF_PRICE_SENSOR, ""))
 
+    def _price_views(
+        self, today: str, tomorrow: str
+    ) -> tuple[list[PriceSlot], list[PriceSlot], list[PriceSlot]]:
+        """Today's/tomorrow's cheapest hours and the night slots for display.
+
+        Reused across refreshes until the price index or the dates change,
+        so the PriceSlot lists are not rebuilt every update cycle.
+        """
+        price_index = self.price_index
+        cached = self._price_views_cache
+        if cached is not None and cached[0] is price_index and cached[1] == (today, tomorrow):
+            return cached[2]
+
+        analyzer = self.price_analyzer
+        views = (
+            analyzer.cheapest_hours_from_index(price_index, today, 3),
+            analyzer.cheapest_hours_from_index(price_index, tomorrow, 3),
+            analyzer.night_prices_from_index(price_index, today, tomorrow),
+        )
+        self._price_views_cache = (price_index, (today, tomorrow), views)
+        return views
+
     @property
-    def price_attributes(self) -> dict[str, Any]:
-        """All attributes from the price sensor."""
-        return self._get_state_attrs(self.entry.data.get(CONF_PRICE_SENSOR, ""))
+    def forecast_error_stats(self) -> tuple[float, float]:
+        """Average forecast error (ratio, percentage) over the stored history window.
+
+        Computed on first use and updated by async_record_forecast_error, the
+        only writer of the history, instead of re-averaging on every read.
+        """
+        if self._forecast_error_stats is None:
+            self._forecast_error_stats = self.forecast_corrector.stats(
+                self.store.forecast_error_history
+            )
+        return self._forecast_error_stats
+
+    @property
+    def price_index(self) -> dict[str, dict[int, list[float]]]:
+        """Price sensor attributes parsed into {date: {hour: [prices]}}.
+
+        Parsed once per sensor update (keyed on the state's last_updated).
+        """
+        state = self.hass.states.get(self.entry.data.get(CONF_PRICE_SENSOR, ""))
+        if state is None:
+            return {}
+        if state.last_updated != self._price_index_stamp:
+            self._price_index = self.price_analyzer.index_prices(state.attributes)
+            self._price_index_stamp = state.last_updated
+        return self._price_index
 
     @property
     def daily_consumption_current(self) -> float:
@@ -363,76 +415,73 @@ class SmartBatteryCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             return self._get_state_float(entity_id)
         return self.actual_solar_today
 
-    @property
-    def solar_forecast_today_hourly(self) -> dict[int, float]:
-        """Hourly solar forecast for today from the forecast_solar integration.
-
-        Returns dict mapping hour (0-23) to kWh production for that hour.
-        Combines all forecast_solar config entries.
-        """
-        result: dict[int, float] = {}
-        now = dt_util.now()
-        today = now.date()
-
+    def _forecast_wh_periods(self) -> list[dict]:
+        """Raw wh_period dicts of all forecast_solar config entries."""
         try:
             entries = self.hass.config_entries.async_entries("forecast_solar")
         except Exception:
-            return result
+            return []
 
+        periods: list[dict] = []
         for entry in entries:
             runtime_data = getattr(entry, "runtime_data", None)
             if runtime_data is None:
                 continue
+            # forecast_solar stores an Estimate object on runtime_data
             estimate = getattr(runtime_data, "data", runtime_data)
             wh_period = getattr(estimate, "wh_period", None)
-            if not isinstance(wh_period, dict):
-                continue
+            if isinstance(wh_period, dict):
+                periods.append(wh_period)
+        return periods
+
+    @staticmethod
+    def _hourly_for_day(periods: list[dict], day: date) -> dict[int, float]:
+        """Sum the wh_period entries falling on `day` into {hour: kWh}."""
+        result: dict[int, float] = {}
+        for wh_period in periods:
             for dt_key, wh_value in wh_period.items():
                 try:
-                    if hasattr(dt_key, "date") and dt_key.date() == today:
+                    if hasattr(dt_key, "date") and dt_key.date() == day:
                         hour = dt_key.hour
                         kwh = float(wh_value) / 1000.0
                         result[hour] = result.get(hour, 0.0) + kwh
                 except (ValueError, TypeError, AttributeError):
                     continue
-
         return result
 
-    @property
-    def solar_forecast_tomorrow_hourly(self) -> dict[int, float]:
-        """Hourly solar forecast for tomorrow from the forecast_solar integration.
+    def _dense_solar_for_day(self, day: date) -> list[float]:
+        """24-value hourly forecast for `day`, rebuilt only when forecasts change.
 
-        Returns dict mapping hour (0-23) to kWh production for that hour.
-        Combines all forecast_solar config entries.
+        forecast_solar replaces its Estimate (and wh_period dict) on every
+        refresh, so the cached list stays valid while the same dicts are seen.
         """
-        result: dict[int, float] = {}
-        now = dt_util.now()
-        tomorrow = (now + timedelta(days=1)).date()
+        periods = self._forecast_wh_periods()
+        cached = self._solar_hourly_cache.get(day)
+        if (
+            cached is not None
+            and len(cached[0]) == len(periods)
+            and all(map(is_, cached[0], periods))
+        ):
+            return cached[1]
+
+        dense = _dense_hourly(self._hourly_for_day(periods, day))
+        if len(self._solar_hourly_cache) >= 2 and day not in self._solar_hourly_cache:
+            del self._solar_hourly_cache[min(self._solar_hourly_cache)]
+        self._solar_hourly_cache[day] = (periods, dense)
+        return dense
 
-        try:
-            entries = self.hass.config_entries.async_entries("forecast_solar")
-        except Exception:
-            return result
+    @property
+    def solar_forecast_today_hourly_list(self) -> list[float]:
+        """Today's hourly solar forecast as a list indexed by hour (0-23).
 
-        for entry in entries:
-            runtime_data = getattr(entry, "runtime_data", None)
-            if runtime_data is None:
-                continue
-            # forecast_solar stores an Estimate object on runtime_data
-            estimate = getattr(runtime_data, "data", runtime_data)
-            wh_period = getattr(estimate, "wh_period", None)
-            if not isinstance(wh_period, dict):
-                continue
-            for dt_key, wh_value in wh_period.items():
-                try:
-                    if hasattr(dt_key, "date") and dt_key.date() == tomorrow:
-                        hour = dt_key.hour
-                        kwh = float(wh_value) / 1000.0
-                        result[hour] = result.get(hour, 0.0) + kwh
-                except (ValueError, TypeError, AttributeError):
-                    continue
+        kWh per hour, summed over all forecast_solar config entries.
+        """
+        return self._dense_solar_for_day(dt_util.now().date())
 
-        return result
+    @property
+    def solar_forecast_tomorrow_hourly_list(self) -> list[float]:
+        """Tomorrow's hourly solar forecast as a list indexed by hour (0-23)."""
+        return self._dense_solar_for_day((dt_util.now() + timedelta(days=1)).date())
 
     @property
     def sunrise_hour_tomorrow(self) -> float | None:
@@ -494,6 +543,7 @@ class SmartBatteryCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         history = self.store.forecast_error_history
         new_history = self.forecast_corrector.add_entry(history, error)
         await self.store.async_set_forecast_error_history(new_history)
+        self._forecast_error_stats = self.forecast_corrector.stats(new_history)
         _LOGGER.info(
             "Recorded forecast error: forecast=%.1f, actual=%.1f, error=%.1f%%",
             forecast, actual, error * 100,
@@ -504,7 +554,7 @@ class SmartBatteryCoordinator(DataUpdateCoordinator[dict[str, Any]]):
     async def async_record_morning_soc(self) -> None:
         """Record battery SOC at sunrise (called at sunrise)."""
         now = dt_util.now()
-        today_str = now.strftime("%Y-%m-%d")
+        today_str = now.date().isoformat()
 
         # Dedup by date
         history = self.store.morning_soc_history
@@ -524,14 +574,13 @@ class SmartBatteryCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             "planned_soc": round(planned_soc, 1) if planned_soc is not None else None,
         }
 
-        new_history = [entry] + history
-        await self.store.async_set_morning_soc_history(new_history[:MORNING_SOC_HISTORY_DAYS])
+        await self.store.async_add_morning_soc(entry)
         _LOGGER.info("Recorded morning SOC: %.1f%% (planned: %s)", soc, planned_soc)
 
     async def async_record_session_cost(self, session: ChargingSession) -> None:
         """Record a charging session's cost (called from charging_controller)."""
         now = dt_util.now()
-        today_str = now.strftime("%Y-%m-%d")
+        today_str = now.date().isoformat()
         capacity = self.battery_capacity
         kwh = session.kwh_charged(capacity)
         cost = session.total_cost(capacity)
@@ -546,15 +595,13 @@ class SmartBatteryCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             "cost": round(cost, 2),
         }
 
-        history = self.store.session_cost_history
-        new_history = [entry] + history
-        await self.store.async_set_session_cost_history(new_history[:SESSION_COST_HISTORY_DAYS])
+        await self.store.async_add_session_cost(entry)
         _LOGGER.info("Recorded session cost: %.2f kWh @ %.2f = %.2f", kwh, session.avg_price, cost)
 
     async def async_record_bms_capacity(self) -> None:
         """Record BMS-reported battery capacity (called at 23:55)."""
         now = dt_util.now()
-        today_str = now.strftime("%Y-%m-%d")
+        today_str = now.date().isoformat()
 
         # Dedup by date
         history = self.store.bms_capacity_history
@@ -572,8 +619,7 @@ class SmartBatteryCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             "capacity_kwh": round(capacity, 2),
         }
 
-        new_history = [entry] + history
-        await self.store.async_set_bms_capacity_history(new_history[:BMS_CAPACITY_HISTORY_DAYS])
+        await self.store.async_add_bms_capacity(entry)
         _LOGGER.info("Recorded BMS capacity: %.2f kWh", capacity)
 
     async def async_record_surplus_runtime(
@@ -586,7 +632,7 @@ class SmartBatteryCoordinator(DataUpdateCoordinator[dict[str, Any]]):
     ) -> None:
         """Record daily surplus load runtimes and energy (called at midnight)."""
         now = dt_util.now()
-        today_str = now.strftime("%Y-%m-%d")
+        today_str = now.date().isoformat()
 
         entry: dict[str, Any] = {
             "date": today_str,
@@ -597,11 +643,7 @@ class SmartBatteryCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         if energy_data:
             entry["energy_kwh"] = energy_data
 
-        history = self.store.surplus_runtime_history
-        new_history = [entry] + history
-        await self.store.async_set_surplus_runtime_history(
-            new_history[:SURPLUS_RUNTIME_HISTORY_DAYS]
-        )
+        await self.store.async_add_surplus_runtime(entry)
         _LOGGER.info("Recorded surplus runtime: %s, energy: %s", runtime_data, energy_data)
 
     # --- Sensor health monitoring (H1) ---
@@ -670,8 +712,8 @@ class SmartBatteryCoordinator(DataUpdateCoordinator[dict[str, Any]]):
     async def _async_update_data(self) -> dict[str, Any]:
         """Recompute all derived values."""
         now = dt_util.now()
-        today = now.strftime("%Y-%m-%d")
-        tomorrow = (now + timedelta(days=1)).strftime("%Y-%m-%d")
+        today = now.date().isoformat()
+        tomorrow = (now.date() + timedelta(days=1)).isoformat()
 
         # Sync fallback consumption from options
         self.consumption_tracker.fallback_kwh = self.fallback_consumption
@@ -682,8 +724,7 @@ class SmartBatteryCoordinator(DataUpdateCoordinator[dict[str, Any]]):
 
         # Forecast error
         error_history = self.store.forecast_error_history
-        forecast_error_avg = self.forecast_corrector.average_error_pct(error_history)
-        forecast_error_ratio = self.forecast_corrector.average_error(error_history)
+        forecast_error_ratio, forecast_error_avg = self.forecast_error_stats
 
         # Solar forecasts
         solar_today = self.solar_forecast_today
@@ -699,27 +740,21 @@ class SmartBatteryCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             today_forecast_error = (self.data or {}).get("today_solar_forecast_error", 0.0)
 
         # Adjusted tomorrow solar
-        adjusted_solar_tomorrow = self.forecast_corrector.adjust_forecast(
-            solar_tomorrow, error_history
+        adjusted_solar_tomorrow = self.forecast_corrector.apply_error(
+            solar_tomorrow, forecast_error_ratio
         )
 
         # H4: Energy deficit + overnight — use trajectory for consistent values
         trajectory = None
         if self.planner is not None:
             try:
-                trajectory = self.planner.simulate_trajectory(now=now)
+                snapshot = self.planner.planning_snapshot(now=now)
+                trajectory = snapshot.trajectory
                 energy_deficit = trajectory.daily_deficit_kwh
                 charge_needed = trajectory.charge_needed_kwh
                 usable_capacity = trajectory.usable_capacity_kwh
                 # Keep overnight data fresh every update cycle
-                self._last_overnight = OvernightNeed(
-                    dark_hours=trajectory.dark_hours,
-                    overnight_consumption=trajectory.overnight_consumption_kwh,
-                    battery_at_window_start=trajectory.battery_at_window_start_kwh,
-                    charge_needed=trajectory.charge_needed_kwh,
-                    solar_start_hour=trajectory.solar_start_hour,
-                    source=trajectory.solar_source,
-                )
+                self._last_overnight = snapshot.overnight
             except Exception:
                 _LOGGER.warning("Planner trajectory failed, using fallback")
                 self._last_overnight = None  # Reset stale overnight data
@@ -741,16 +776,12 @@ class SmartBatteryCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         battery_to_max = round(max(max_kwh - battery_charge_kwh, 0), 2)
 
         # Price analysis
-        price_attrs = self.price_attributes
         price_status = self.price_analyzer.classify_price(
             self.current_price, self.max_charge_price
         )
 
-        today_cheapest = self.price_analyzer.find_cheapest_hours(price_attrs, today, 3)
-        tomorrow_cheapest = self.price_analyzer.find_cheapest_hours(price_attrs, tomorrow, 3)
-
-        # Night price window (for display)
-        night_slots = self.price_analyzer.extract_night_prices(price_attrs, today, tomorrow)
+        # Cheapest hours and night price window (for display)
+        today_cheapest, tomorrow_cheapest, night_slots = self._price_views(today, tomorrow)
 
         # Charging status
         charging_status = self._compute_charging_status(soc)
@@ -769,6 +800,9 @@ class SmartBatteryCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             and soc < self.max_charge_level
         )
 
+        # Overnight survival
+        overnight = self._last_overnight
+
         data: dict[str, Any] = {
             # Consumption
             "average_daily_consumption": avg_consumption,
@@ -811,10 +845,14 @@ class SmartBatteryCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             "charging_recommended": charging_recommended,
             "schedule": self.current_schedule,
             # Overnight survival
-            "overnight_dark_hours": self._last_overnight.dark_hours if self._last_overnight else None,
-            "overnight_consumption_estimate": self._last_overnight.overnight_consumption if self._last_overnight else None,
-            "overnight_battery_at_window_start": self._last_overnight.battery_at_window_start if self._last_overnight else None,
-            "overnight_charge_needed": self._last_overnight.charge_needed if self._last_overnight else None,
+            "overnight_dark_hours": round(overnight.dark_hours, 1) if overnight else None,
+            "overnight_consumption_estimate": (
+                round(overnight.overnight_consumption, 2) if overnight else None
+            ),
+            "overnight_battery_at_window_start": (
+                round(overnight.battery_at_window_start, 2) if overnight else None
+            ),
+            "overnight_charge_needed": overnight.charge_needed if overnight else None,
             # Last session
             "last_session": last_session,
             "last_night_charge_kwh": last_kwh,
@@ -1057,22 +1095,9 @@ class SmartBatteryCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             return None
 
     def _compute_daytime_avg_price(self, now: Any) -> float:
-        """Compute average daytime price (hours 8-19) from today's price attributes."""
-        price_attrs = self.price_attributes
-        today_str = now.strftime("%Y-%m-%d") if hasattr(now, "strftime") else ""
-        prices: list[float] = []
-        for key, value in price_attrs.items():
-            key_str = str(key)
-            if len(key_str) < 13:
-                continue
-            if key_str[:10] != today_str:
-                continue
-            try:
-                hour = int(key_str[11:13])
-                if 8 <= hour < 19:
-                    prices.append(float(value))
-            except (ValueError, TypeError, IndexError):
-                continue
-        if prices:
-            return sum(prices) / len(prices)
+        """Compute average daytime price (hours 8-19) over every price slot today."""
+        today_str = now.date().isoformat() if hasattr(now, "date") else ""
+        avg = self.price_analyzer.average_price_from_index(self.price_index, today_str, 8, 19)
+        if avg is not None:
+            return avg
         return self.current_price
@@ -9,6 +9,8 @@ Negative values = forecast underestimates (common in summer).
 
 from __future__ import annotations
 
+from collections.abc import Sequence
+
 
 class ForecastCorrector:
     """Tracks and corrects solar forecast errors using a sliding window."""
@@ -28,7 +30,7 @@ class ForecastCorrector:
             return None
         return round((forecast_kwh - actual_kwh) / forecast_kwh, 4)
 
-    def average_error(self, history: list[float]) -> float:
+    def average_error(self, history: Sequence[float]) -> float:
         """Compute the average forecast error from history.
 
         Args:
@@ -43,7 +45,7 @@ class ForecastCorrector:
             return 0.0
         return round(sum(values) / len(values), 4)
 
-    def average_error_pct(self, history: list[float]) -> float:
+    def average_error_pct(self, history: Sequence[float]) -> float:
         """Compute the average forecast error as a percentage.
 
         Args:
@@ -52,9 +54,21 @@ class ForecastCorrector:
         Returns:
             Average error as percentage (e.g., 42.0 = 42% overestimate).
         """
-        return round(self.average_error(history) * 100, 1)
+        return self.stats(history)[1]
+
+    def stats(self, history: Sequence[float]) -> tuple[float, float]:
+        """Compute the average forecast error as both ratio and percentage.
+
+        Args:
+            history: List of error ratios (most recent first).
+
+        Returns:
+            (average ratio, average percentage), from a single pass over history.
+        """
+        avg_error = self.average_error(history)
+        return avg_error, round(avg_error * 100, 1)
 
-    def add_entry(self, history: list[float], error: float) -> list[float]:
+    def add_entry(self, history: Sequence[float], error: float) -> list[float]:
         """Add a new error entry to the front of history, trimming to window size.
 
         Args:
@@ -64,9 +78,9 @@ class ForecastCorrector:
         Returns:
             New history list (does not mutate input).
         """
-        return [error] + history[: self._window_days - 1]
+        return [error, *history[: self._window_days - 1]]
 
-    def adjust_forecast(self, forecast_kwh: float, history: list[float]) -> float:
+    def adjust_forecast(self, forecast_kwh: float, history: Sequence[float]) -> float:
         """Adjust a solar forecast based on historical error.
 
         Bidirectional correction:
@@ -80,5 +94,19 @@ class ForecastCorrector:
         Returns:
             Adjusted forecast value (never negative).
         """
-        avg_error = self.average_error(history)
+        return self.apply_error(forecast_kwh, self.average_error(history))
+
+    def apply_error(self, forecast_kwh: float, avg_error: float) -> float:
+        """Adjust a solar forecast by an already-computed average error.
+
+        Use this instead of adjust_forecast when the average is shared by
+        several forecasts, to avoid re-scanning the history.
+
+        Args:
+            forecast_kwh: Raw forecast value.
+            avg_error: Average error ratio, as returned by average_error().
+
+        Returns:
+            Adjusted forecast value (never negative).
+        """
         return max(0.0, round(forecast_kwh * (1 - avg_error), 2))
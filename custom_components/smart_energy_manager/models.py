@@ -71,7 +71,7 @@ class ChargingSession:
         return round(self.kwh_charged(battery_capacity_kwh) * self.avg_price, 1)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class EnergyDeficit:
     """Result of the energy deficit calculation."""
 
@@ -84,7 +84,7 @@ class EnergyDeficit:
     usable_capacity: float
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class OvernightNeed:
     """Result of the overnight survival calculation.
 
@@ -100,7 +100,7 @@ class OvernightNeed:
     source: str  # "forecast_solar" or "sun_entity" or "fallback"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TrajectoryResult:
     """Result of the hour-by-hour SOC trajectory simulation."""
 
@@ -126,8 +126,40 @@ class TrajectoryResult:
     forecast_error_pct: float
     usable_capacity_kwh: float
 
-
-@dataclass(frozen=True)
+    def to_energy_deficit(self) -> EnergyDeficit:
+        """Build the EnergyDeficit view."""
+        return EnergyDeficit(
+            consumption=self.tomorrow_consumption,
+            solar_raw=self.tomorrow_solar_raw,
+            solar_adjusted=self.tomorrow_solar_adjusted,
+            forecast_error_pct=self.forecast_error_pct,
+            deficit=self.daily_deficit_kwh,
+            charge_needed=self.charge_needed_kwh,
+            usable_capacity=self.usable_capacity_kwh,
+        )
+
+    def to_overnight_need(self) -> OvernightNeed:
+        """Build the OvernightNeed view."""
+        return OvernightNeed(
+            dark_hours=self.dark_hours,
+            overnight_consumption=self.overnight_consumption_kwh,
+            battery_at_window_start=self.battery_at_window_start_kwh,
+            charge_needed=self.charge_needed_kwh,
+            solar_start_hour=self.solar_start_hour,
+            source=self.solar_source,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class PlanningSnapshot:
+    """One trajectory simulation with its EnergyDeficit and OvernightNeed views."""
+
+    trajectory: TrajectoryResult
+    deficit: EnergyDeficit
+    overnight: OvernightNeed
+
+
+@dataclass(frozen=True, slots=True)
 class SurplusForecast:
     """Predicted solar surplus for today."""
 
@@ -180,7 +212,7 @@ class SurplusLoadState:
     last_notified_on: bool | None = None  # Last notification state (None=never notified)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PredictiveEvaluation:
     """Result of evaluating whether a predictive load should run."""
 
@@ -7,7 +7,11 @@ Decides whether charging is needed, how much, and when.
 from __future__ import annotations
 
 import logging
+from collections.abc import Sequence
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from itertools import accumulate
+from operator import sub
 from typing import TYPE_CHECKING
 
 from .const import (
@@ -18,6 +22,7 @@ from .models import (
     ChargingSchedule,
     EnergyDeficit,
     OvernightNeed,
+    PlanningSnapshot,
     PredictiveEvaluation,
     SurplusForecast,
     SurplusLoadConfig,
@@ -29,18 +34,140 @@ if TYPE_CHECKING:
 
 _LOGGER = logging.getLogger(__name__)
 
+_ONE_DAY = timedelta(days=1)
+
+
+def _now_or_default(now: datetime | None) -> datetime:
+    """Return `now`, falling back to the wall clock when not passed (e.g. in tests)."""
+    return datetime.now() if now is None else now
+
+
+def _date_key(d: datetime) -> str:
+    """Format a date as the YYYY-MM-DD prefix used by price attribute keys."""
+    return d.date().isoformat()
+
+
+def _simulate_hours(
+    start_hour: int,
+    soc_kwh: float,
+    max_soc_kwh: float,
+    hourly_cons: Sequence[float],
+    solar_by_hour: Sequence[float],
+    window_start: int,
+    window_end: int,
+) -> tuple[float, int, float, float, float, float | None, float]:
+    """Step the battery hour-by-hour from start_hour through end of tomorrow.
+
+    Purely numeric: `hourly_cons` holds the 24 per-hour consumption values
+    and `solar_by_hour` 48 kWh values (today's hours, then tomorrow's).
+
+    Returns (min_soc_reached, min_soc_hour, battery_at_window_start,
+    dark_hours, overnight_consumption, solar_start_hour,
+    tomorrow_consumption_total); solar_start_hour is None when solar never
+    covers consumption after the window.
+    """
+    cons_by_hour = list(hourly_cons) * 2  # aligned with solar_by_hour (0-47)
+
+    # First window start after now, as an absolute hour (0-47)
+    window_start_abs = window_start if start_hour <= window_start else window_start + 24
+
+    # Overnight period: window start until the first post-window hour solar covers
+    solar_start_abs = next(
+        (
+            h
+            for h in range(window_start_abs, 48)
+            if window_end <= h % 24 < window_start
+            and solar_by_hour[h] >= cons_by_hour[h]
+        ),
+        None,
+    )
+    overnight_end = 47 if solar_start_abs is None else solar_start_abs
+    dark_hours = float(overnight_end - window_start_abs + 1)
+    overnight = slice(window_start_abs, overnight_end + 1)
+    overnight_consumption = sum(
+        max(0.0, drain)
+        for drain in map(sub, cons_by_hour[overnight], solar_by_hour[overnight])
+    )
+    solar_start_hour = None if solar_start_abs is None else float(solar_start_abs % 24)
+
+    # SOC after each hour: a running sum of net energy, clamped at every step
+    net = map(sub, solar_by_hour[start_hour:], cons_by_hour[start_hour:])
+    socs = list(
+        accumulate(
+            net,
+            lambda soc, delta: max(0.0, min(soc + delta, max_soc_kwh)),
+            initial=soc_kwh,
+        )
+    )[1:]
+
+    lowest = min(socs)
+    if lowest < soc_kwh:
+        min_soc_reached = lowest
+        min_soc_hour = (start_hour + socs.index(lowest)) % 24
+    else:
+        min_soc_reached = soc_kwh
+        min_soc_hour = start_hour
+    battery_at_window_start = socs[window_start_abs - start_hour]
+
+    tomorrow_consumption_total = sum(hourly_cons)
+
+    return (
+        min_soc_reached,
+        min_soc_hour,
+        battery_at_window_start,
+        dark_hours,
+        overnight_consumption,
+        solar_start_hour,
+        tomorrow_consumption_total,
+    )
+
+
+def _clamp_target_soc(target: float, max_charge_level: float) -> float:
+    """Cap a target SOC at max_charge_level, rounding to 0.1 % only below the cap."""
+    return max_charge_level if target >= max_charge_level else round(target, 1)
+
+
+@dataclass(frozen=True, slots=True)
+class _PlanContext:
+    """Coordinator values read once per planning pass.
+
+    Built at the top of plan_charging and threaded into the trajectory
+    simulation so config properties are not re-read through the coordinator.
+    """
 
-def _default_now() -> datetime:
-    """Fallback for when no `now` is passed (e.g. in tests)."""
-    return datetime.now()
+    battery_capacity: float
+    current_soc: float
+    min_soc: float
+    max_charge_level: float
+    charging_efficiency: float
+    daily_consumption: float  # baseline for tomorrow, weekend multiplier applied
+    is_weekend: bool  # tomorrow is Saturday/Sunday
+    usable_capacity: float  # kWh between min_soc and max_charge_level
+    hourly_consumption: tuple[float, ...]  # tomorrow's kWh per clock hour (24)
+    forecast_error: float  # average forecast error ratio over the history window
+    forecast_error_pct: float  # the same average as a rounded percentage
 
 
 class ChargingPlanner:
     """Plans charging sessions based on energy deficit and price analysis."""
 
+    __slots__ = (
+        "_coordinator",
+        "_snapshot",
+        "_trajectory_cache",
+        "_weights",
+        "_weights_key",
+        "last_overnight_need",
+    )
+
     def __init__(self, coordinator: SmartBatteryCoordinator) -> None:
         self._coordinator = coordinator
         self.last_overnight_need: OvernightNeed | None = None
+        self._weights_key: tuple[float, float] | None = None
+        self._weights: tuple[float, ...] = ()
+        # (inputs, result) of the last simulation; reused when inputs repeat
+        self._trajectory_cache: tuple[tuple, TrajectoryResult] | None = None
+        self._snapshot: PlanningSnapshot | None = None
 
     # --- Surplus energy baseline ---
 
@@ -59,82 +186,112 @@ class ChargingPlanner:
             totals.append(sum(energy.values()))
         return sum(totals) / len(totals) if totals else 0.0
 
+    # --- Planning context ---
+
+    def _build_context(self, now: datetime) -> _PlanContext:
+        """Read all coordinator values needed for one planning pass."""
+        c = self._coordinator
+        daily_consumption = c.consumption_tracker.average(c.store.consumption_history)
+        daily_consumption = max(0.0, daily_consumption - self._avg_surplus_energy())
+        is_weekend = (now + _ONE_DAY).weekday() >= 5
+        if is_weekend:
+            daily_consumption *= c.weekend_consumption_multiplier
+
+        capacity = c.battery_capacity
+        min_soc = c.min_soc
+        max_charge_level = c.max_charge_level
+        forecast_error, forecast_error_pct = c.forecast_error_stats
+        return _PlanContext(
+            battery_capacity=capacity,
+            current_soc=c.current_soc,
+            min_soc=min_soc,
+            max_charge_level=max_charge_level,
+            charging_efficiency=c.charging_efficiency,
+            daily_consumption=daily_consumption,
+            is_weekend=is_weekend,
+            usable_capacity=capacity * (max_charge_level - min_soc) / 100,
+            hourly_consumption=tuple(daily_consumption * w for w in self._hourly_weights()),
+            forecast_error=forecast_error,
+            forecast_error_pct=forecast_error_pct,
+        )
+
     # --- Hourly consumption model ---
 
-    def _hourly_consumption(self, hour: int, daily: float) -> float:
-        """Return kWh consumption for a given hour using the 3-period model.
+    def _hourly_weights(self) -> tuple[float, ...]:
+        """Return each clock hour's share of daily consumption (sums to 1.0).
 
         Periods: Day (06-18) multiplier=1.0, Evening (18-23) multiplier=E, Night (23-06) multiplier=N.
-        base_rate = daily / (12*1.0 + 5*E + 7*N)
+        weight = multiplier / (12*1.0 + 5*E + 7*N)
+
+        The table is rebuilt only when the multipliers change.
         """
         c = self._coordinator
         e = c.evening_consumption_multiplier
         n = c.night_consumption_multiplier
-        base_rate = daily / (12 * 1.0 + 5 * e + 7 * n)
-
-        if 6 <= hour < 18:
-            return base_rate * 1.0
-        elif 18 <= hour < 23:
-            return base_rate * e
-        else:  # 23-06
-            return base_rate * n
+        if self._weights_key != (e, n):
+            divisor = 12 * 1.0 + 5 * e + 7 * n
+            day, evening, night = 1.0 / divisor, e / divisor, n / divisor
+            self._weights = tuple(
+                day if 6 <= h < 18 else evening if 18 <= h < 23 else night
+                for h in range(24)
+            )
+            self._weights_key = (e, n)
+        return self._weights
 
     # --- Solar profile builder ---
 
     def _build_solar_profile(
-        self, now: datetime,
-    ) -> tuple[dict[tuple[int, int], float], str]:
+        self, now: datetime, avg_error: float | None = None,
+    ) -> tuple[list[float], str]:
         """Build hourly solar production profile for today and tomorrow.
 
+        `avg_error` is the average forecast error ratio; the coordinator's
+        cached average is used when not supplied.
+
         Returns (profile, source):
-          profile: {(day_offset, clock_hour): kwh} where day_offset 0=today, 1=tomorrow
+          profile: 48 kWh values indexed by day_offset * 24 + clock_hour,
+            where day_offset 0=today, 1=tomorrow
           source: "forecast_solar" or "fallback"
         """
         c = self._coordinator
-        error_history = c.store.forecast_error_history
-        hourly_today = c.solar_forecast_today_hourly
-        hourly_tomorrow = c.solar_forecast_tomorrow_hourly
+        corrector = c.forecast_corrector
+        if avg_error is None:
+            avg_error = c.forecast_error_stats[0]
+        hourly_today = c.solar_forecast_today_hourly_list
+        hourly_tomorrow = c.solar_forecast_tomorrow_hourly_list
 
-        profile: dict[tuple[int, int], float] = {}
+        profile = [0.0] * 48
         source = "fallback"
 
         # --- Today's remaining solar ---
         if hourly_today:
             source = "forecast_solar"
-            for h in range(24):
-                profile[(0, h)] = hourly_today.get(h, 0.0)
+            profile[:24] = hourly_today
         else:
-            adjusted_today = c.forecast_corrector.adjust_forecast(
-                c.solar_forecast_today, error_history
-            )
+            adjusted_today = corrector.apply_error(c.solar_forecast_today, avg_error)
             remaining = max(0.0, adjusted_today - c.actual_solar_today)
             daylight_remaining = [h for h in range(6, 18) if h >= now.hour]
             if daylight_remaining and remaining > 0:
                 per_hour = remaining / len(daylight_remaining)
                 for h in daylight_remaining:
-                    profile[(0, h)] = per_hour
+                    profile[h] = per_hour
 
         # --- Tomorrow's solar (with error correction) ---
         if hourly_tomorrow:
             source = "forecast_solar"
-            avg_error = c.forecast_corrector.average_error(error_history)
-            for h in range(24):
-                raw = hourly_tomorrow.get(h, 0.0)
-                profile[(1, h)] = raw * (1 - avg_error)
+            correction = 1 - avg_error
+            profile[24:] = [raw * correction for raw in hourly_tomorrow]
         else:
-            solar_adjusted = c.forecast_corrector.adjust_forecast(
-                c.solar_forecast_tomorrow, error_history
-            )
+            solar_adjusted = corrector.apply_error(c.solar_forecast_tomorrow, avg_error)
             if solar_adjusted > 0:
-                for h in range(6, 18):
-                    profile[(1, h)] = solar_adjusted / 12
+                profile[30:42] = [solar_adjusted / 12] * 12  # tomorrow 06-17
 
         return profile, source
 
     # --- Core trajectory simulation ---
 
     def simulate_trajectory(
-        self, *, now: datetime | None = None,
+        self, *, now: datetime | None = None, ctx: _PlanContext | None = None,
     ) -> TrajectoryResult:
         """Simulate battery SOC hour-by-hour from now through end of tomorrow.
 
@@ -146,173 +303,148 @@ class ChargingPlanner:
 
         Returns a TrajectoryResult with the charge needed to keep SOC above
         min_soc at all times, plus backward-compatible data.
+
+        Pass `ctx` to reuse coordinator values already read for this
+        planning pass; otherwise they are read here.
         """
-        if now is None:
-            now = _default_now()
+        now = _now_or_default(now)
+        if ctx is None:
+            ctx = self._build_context(now)
         c = self._coordinator
 
         # --- Base parameters ---
-        daily_consumption = c.consumption_tracker.average(c.store.consumption_history)
-        daily_consumption = max(0.0, daily_consumption - self._avg_surplus_energy())
-        tomorrow = now + timedelta(days=1)
-        if tomorrow.weekday() >= 5:
-            daily_consumption *= c.weekend_consumption_multiplier
+        capacity = ctx.battery_capacity
+        min_soc_kwh = capacity * ctx.min_soc / 100
+        max_soc_kwh = capacity * ctx.max_charge_level / 100
+        usable_capacity = ctx.usable_capacity
 
-        capacity = c.battery_capacity
-        min_soc_kwh = capacity * c.min_soc / 100
-        max_soc_kwh = capacity * c.max_charge_level / 100
-        usable_capacity = max_soc_kwh - min_soc_kwh
-
-        soc_kwh = capacity * c.current_soc / 100
+        soc_kwh = capacity * ctx.current_soc / 100
 
         # --- Solar profile ---
-        solar_profile, solar_source = self._build_solar_profile(now)
+        solar_by_hour, solar_source = self._build_solar_profile(now, ctx.forecast_error)
 
         window_start = c.price_analyzer._window_start  # e.g. 22
         window_end = c.price_analyzer._window_end  # e.g. 6
+        solar_raw_tomorrow = c.solar_forecast_tomorrow
 
-        # --- Tracking ---
-        min_soc_reached = soc_kwh
-        min_soc_hour = now.hour
-        battery_at_window_start: float | None = None
-        dark_hours = 0.0
-        overnight_consumption = 0.0
-        solar_start_hour: float | None = None
-        in_overnight = False
-        tomorrow_consumption_total = 0.0
+        # --- Reuse the last result when every input is unchanged ---
+        # (e.g. compute_energy_deficit followed by plan_charging in one run)
+        cache_key = (
+            now.hour, ctx, tuple(solar_by_hour), solar_source,
+            window_start, window_end, solar_raw_tomorrow,
+        )
+        cached = self._trajectory_cache
+        if cached is not None and cached[0] == cache_key:
+            return cached[1]
 
         # --- Simulate: from now.hour through end of tomorrow ---
-        start_hour = now.hour
-        total_steps = (24 - start_hour) + 24
-
-        for step in range(total_steps):
-            absolute_hour = start_hour + step
-            if absolute_hour < 24:
-                day_offset = 0
-                clock_hour = absolute_hour
-            else:
-                day_offset = 1
-                clock_hour = absolute_hour - 24
-
-            hourly_cons = self._hourly_consumption(clock_hour, daily_consumption)
-            solar_h = solar_profile.get((day_offset, clock_hour), 0.0)
-
-            soc_kwh += solar_h - hourly_cons
-            soc_kwh = max(0.0, min(soc_kwh, max_soc_kwh))
-
-            # Track minimum SOC
-            if soc_kwh < min_soc_reached:
-                min_soc_reached = soc_kwh
-                min_soc_hour = clock_hour
-
-            # Track battery at window start (first occurrence after now)
-            if clock_hour == window_start and battery_at_window_start is None:
-                battery_at_window_start = soc_kwh
-                in_overnight = True
-
-            # Track overnight period (window_start to solar coverage)
-            if in_overnight and solar_start_hour is None:
-                net_drain = max(0.0, hourly_cons - solar_h)
-                overnight_consumption += net_drain
-                dark_hours += 1.0
-                past_window = (
-                    clock_hour >= window_end and clock_hour < window_start
-                )
-                if solar_h >= hourly_cons and past_window:
-                    solar_start_hour = float(clock_hour)
-
-            # Track tomorrow's total consumption
-            if day_offset == 1:
-                tomorrow_consumption_total += hourly_cons
+        (
+            min_soc_reached,
+            min_soc_hour,
+            battery_at_window_start,
+            dark_hours,
+            overnight_consumption,
+            solar_start_hour,
+            tomorrow_consumption_total,
+        ) = _simulate_hours(
+            now.hour,
+            soc_kwh,
+            max_soc_kwh,
+            ctx.hourly_consumption,
+            solar_by_hour,
+            window_start,
+            window_end,
+        )
 
         # --- Defaults for untracked values ---
-        if battery_at_window_start is None:
-            # Now is already past window_start (e.g., running at 04:00)
-            battery_at_window_start = capacity * c.current_soc / 100
-
         if solar_start_hour is None:
             solar_start_hour = float(window_end) + PV_FALLBACK_BUFFER_HOURS
 
         # --- Charge needed ---
         shortfall = min_soc_kwh - min_soc_reached
         if shortfall > 0:
-            charge_needed = shortfall / c.charging_efficiency
+            charge_needed = shortfall / ctx.charging_efficiency
             charge_needed = min(charge_needed, usable_capacity)
         else:
             charge_needed = 0.0
 
         # --- Backward-compat daily totals ---
-        solar_raw_tomorrow = c.solar_forecast_tomorrow
-        error_history = c.store.forecast_error_history
-        solar_adjusted_tomorrow = c.forecast_corrector.adjust_forecast(
-            solar_raw_tomorrow, error_history
+        solar_adjusted_tomorrow = c.forecast_corrector.apply_error(
+            solar_raw_tomorrow, ctx.forecast_error
         )
-        forecast_error_pct = c.forecast_corrector.average_error_pct(error_history)
         daily_deficit = max(0.0, tomorrow_consumption_total - solar_adjusted_tomorrow)
         daily_charge = max(0.0, min(daily_deficit, usable_capacity))
 
         bws_usable = max(0.0, battery_at_window_start - min_soc_kwh)
 
-        return TrajectoryResult(
+        # Fields stay unrounded for downstream math; display rounding happens
+        # in the coordinator. charge_needed is kept at 0.01 kWh so float noise
+        # cannot add an extra charging hour via calculate_hours_needed's ceil.
+        result = TrajectoryResult(
             charge_needed_kwh=round(charge_needed, 2),
-            min_soc_kwh=round(min_soc_reached, 2),
+            min_soc_kwh=min_soc_reached,
             min_soc_hour=min_soc_hour,
-            daily_deficit_kwh=round(daily_deficit, 2),
-            daily_charge_kwh=round(daily_charge, 2),
-            battery_at_window_start_kwh=round(bws_usable, 2),
-            dark_hours=round(dark_hours, 1),
-            overnight_consumption_kwh=round(overnight_consumption, 2),
-            solar_start_hour=round(solar_start_hour, 2),
+            daily_deficit_kwh=daily_deficit,
+            daily_charge_kwh=daily_charge,
+            battery_at_window_start_kwh=bws_usable,
+            dark_hours=dark_hours,
+            overnight_consumption_kwh=overnight_consumption,
+            solar_start_hour=solar_start_hour,
             solar_source=solar_source,
-            tomorrow_consumption=round(tomorrow_consumption_total, 2),
-            tomorrow_solar_raw=round(solar_raw_tomorrow, 2),
-            tomorrow_solar_adjusted=round(solar_adjusted_tomorrow, 2),
-            forecast_error_pct=forecast_error_pct,
-            usable_capacity_kwh=round(usable_capacity, 2),
+            tomorrow_consumption=tomorrow_consumption_total,
+            tomorrow_solar_raw=solar_raw_tomorrow,
+            tomorrow_solar_adjusted=solar_adjusted_tomorrow,
+            forecast_error_pct=ctx.forecast_error_pct,
+            usable_capacity_kwh=usable_capacity,
         )
+        self._trajectory_cache = (cache_key, result)
+        return result
 
     # --- Public API (backward-compatible wrappers) ---
 
-    def compute_energy_deficit(self, *, now: datetime | None = None) -> EnergyDeficit:
-        """Compute energy deficit — thin wrapper over simulate_trajectory.
+    def planning_snapshot(
+        self, *, now: datetime | None = None, ctx: _PlanContext | None = None,
+    ) -> PlanningSnapshot:
+        """Simulate once and return the trajectory with its deficit/overnight views.
+
+        The snapshot is reused for as long as simulate_trajectory returns
+        its cached result, so repeated calls within a tick are free.
+        """
+        t = self.simulate_trajectory(now=now, ctx=ctx)
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.trajectory is not t:
+            snapshot = PlanningSnapshot(
+                trajectory=t, deficit=t.to_energy_deficit(), overnight=t.to_overnight_need(),
+            )
+            self._snapshot = snapshot
+        return snapshot
+
+    def compute_energy_deficit(
+        self, *, now: datetime | None = None, ctx: _PlanContext | None = None,
+    ) -> EnergyDeficit:
+        """Compute energy deficit — thin wrapper over planning_snapshot.
 
         Returns an EnergyDeficit with trajectory-based charge_needed that
         accounts for current SOC and hour-by-hour solar/consumption.
         """
-        t = self.simulate_trajectory(now=now)
-        return EnergyDeficit(
-            consumption=t.tomorrow_consumption,
-            solar_raw=t.tomorrow_solar_raw,
-            solar_adjusted=t.tomorrow_solar_adjusted,
-            forecast_error_pct=t.forecast_error_pct,
-            deficit=t.daily_deficit_kwh,
-            charge_needed=t.charge_needed_kwh,
-            usable_capacity=t.usable_capacity_kwh,
-        )
+        return self.planning_snapshot(now=now, ctx=ctx).deficit
 
-    def has_tomorrow_prices(self, *, now: datetime | None = None) -> bool:
-        """Check if tomorrow's prices are available in the price sensor attributes."""
-        if now is None:
-            now = _default_now()
-        tomorrow = (now + timedelta(days=1)).strftime("%Y-%m-%d")
-        attrs = self._coordinator.price_attributes
-        for key in attrs:
-            key_str = str(key)
-            if len(key_str) >= 10 and key_str[:10] == tomorrow:
-                return True
-        return False
-
-    def compute_overnight_need(self, *, now: datetime | None = None) -> OvernightNeed:
-        """Compute overnight survival — thin wrapper over simulate_trajectory."""
-        t = self.simulate_trajectory(now=now)
-        return OvernightNeed(
-            dark_hours=t.dark_hours,
-            overnight_consumption=t.overnight_consumption_kwh,
-            battery_at_window_start=t.battery_at_window_start_kwh,
-            charge_needed=t.charge_needed_kwh,
-            solar_start_hour=t.solar_start_hour,
-            source=t.solar_source,
-        )
+    def has_tomorrow_prices(
+        self, *, now: datetime | None = None, tomorrow_str: str | None = None,
+    ) -> bool:
+        """Check if tomorrow's prices are available in the price sensor attributes.
+
+        Pass `tomorrow_str` (YYYY-MM-DD) when the caller has already formatted it.
+        """
+        if tomorrow_str is None:
+            tomorrow_str = _date_key(_now_or_default(now) + _ONE_DAY)
+        return tomorrow_str in self._coordinator.price_index
+
+    def compute_overnight_need(
+        self, *, now: datetime | None = None, ctx: _PlanContext | None = None,
+    ) -> OvernightNeed:
+        """Compute overnight survival — thin wrapper over planning_snapshot."""
+        return self.planning_snapshot(now=now, ctx=ctx).overnight
 
     def compute_target_soc(
         self, deficit: EnergyDeficit, *, charge_kwh: float | None = None
@@ -322,13 +454,14 @@ class ChargingPlanner:
         target = min_soc + (charge_needed / capacity * 100), clamped to max_charge_level.
         """
         c = self._coordinator
+        min_soc = c.min_soc
         effective_charge = charge_kwh if charge_kwh is not None else deficit.charge_needed
         if effective_charge <= 0:
-            return c.min_soc
+            return min_soc
 
         charge_pct = effective_charge / c.battery_capacity * 100
-        target = c.min_soc + charge_pct
-        return min(round(target, 1), c.max_charge_level)
+        target = min_soc + charge_pct
+        return _clamp_target_soc(target, c.max_charge_level)
 
     def plan_charging(self, *, now: datetime | None = None) -> ChargingSchedule | None:
         """Full planning pipeline using trajectory simulation.
@@ -336,30 +469,28 @@ class ChargingPlanner:
         Returns a ChargingSchedule if charging is needed and prices are acceptable,
         or None if no charging needed / prices not available / prices too high.
         """
-        if now is None:
-            now = _default_now()
         c = self._coordinator
 
+        # Checked before any datetime work so the disabled path stays trivial
         if not c.enabled:
             _LOGGER.debug("Charging disabled, skipping planning")
             return None
 
-        if not self.has_tomorrow_prices(now=now):
+        now = _now_or_default(now)
+        tomorrow_str = _date_key(now + _ONE_DAY)
+
+        if not self.has_tomorrow_prices(tomorrow_str=tomorrow_str):
             _LOGGER.debug("Tomorrow's prices not available yet")
             return None
+        today = _date_key(now)
 
         # Single trajectory simulation
-        trajectory = self.simulate_trajectory(now=now)
+        ctx = self._build_context(now)
+        snapshot = self.planning_snapshot(now=now, ctx=ctx)
+        trajectory = snapshot.trajectory
 
         # Cache backward-compat views for sensors
-        self.last_overnight_need = OvernightNeed(
-            dark_hours=trajectory.dark_hours,
-            overnight_consumption=trajectory.overnight_consumption_kwh,
-            battery_at_window_start=trajectory.battery_at_window_start_kwh,
-            charge_needed=trajectory.charge_needed_kwh,
-            solar_start_hour=trajectory.solar_start_hour,
-            source=trajectory.solar_source,
-        )
+        self.last_overnight_need = snapshot.overnight
         c._last_overnight = self.last_overnight_need
 
         _LOGGER.info(
@@ -377,34 +508,37 @@ class ChargingPlanner:
             return None
 
         # Extract night prices and find cheapest window
-        today = now.strftime("%Y-%m-%d")
-        tomorrow_str = (now + timedelta(days=1)).strftime("%Y-%m-%d")
-
-        night_slots = c.price_analyzer.extract_night_prices(
-            c.price_attributes, today, tomorrow_str
+        analyzer = c.price_analyzer
+        night_slots = analyzer.night_prices_from_index(
+            c.price_index, today, tomorrow_str
         )
 
         if not night_slots:
             _LOGGER.warning("No night price slots available")
             return None
 
-        # Negative price exploitation — charge to max when free/profitable
+        # Negative price exploitation — charge to max when free/profitable.
+        # Skipped when the trajectory already asks for the full usable capacity.
         usable_capacity = trajectory.usable_capacity_kwh
-        cheapest_price = min(slot.price for slot in night_slots)
-        if cheapest_price <= 0 and effective_charge < usable_capacity:
-            _LOGGER.info(
-                "Negative prices detected (%.2f), charging to maximum %.1f kWh",
-                cheapest_price, usable_capacity,
-            )
-            effective_charge = usable_capacity
+        night_prices = [slot.price for slot in night_slots]
+        if effective_charge < usable_capacity:
+            cheapest_price = min(night_prices)
+            if cheapest_price <= 0:
+                _LOGGER.info(
+                    "Negative prices detected (%.2f), charging to maximum %.1f kWh",
+                    cheapest_price, usable_capacity,
+                )
+                effective_charge = usable_capacity
 
-        hours_needed = c.price_analyzer.calculate_hours_needed(
+        hours_needed = analyzer.calculate_hours_needed(
             effective_charge, c.max_charge_power
         )
         if hours_needed == 0:
             return None
 
-        window = c.price_analyzer.find_cheapest_window(night_slots, hours_needed)
+        window = analyzer.find_cheapest_window(
+            night_slots, hours_needed, prices=night_prices
+        )
         if window is None:
             _LOGGER.warning(
                 "Could not find contiguous %d-hour window in night prices",
@@ -413,41 +547,31 @@ class ChargingPlanner:
             return None
 
         # Price threshold check — skip for negative/zero avg price
-        if window.avg_price > 0 and window.avg_price > c.max_charge_price:
-            current_soc = c.current_soc
+        max_charge_price = c.max_charge_price
+        if window.avg_price > 0 and window.avg_price > max_charge_price:
+            current_soc = ctx.current_soc
             if current_soc < EMERGENCY_SOC_THRESHOLD and effective_charge > 0:
                 _LOGGER.warning(
                     "Battery at %.0f%% (below emergency threshold %.0f%%) — "
                     "overriding price threshold (%.2f > %.2f)",
                     current_soc, EMERGENCY_SOC_THRESHOLD,
-                    window.avg_price, c.max_charge_price,
+                    window.avg_price, max_charge_price,
                 )
             else:
                 _LOGGER.info(
                     "Cheapest window avg price %.2f exceeds threshold %.2f, skipping",
                     window.avg_price,
-                    c.max_charge_price,
+                    max_charge_price,
                 )
                 return None
 
-        # Build EnergyDeficit for notification
-        deficit = EnergyDeficit(
-            consumption=trajectory.tomorrow_consumption,
-            solar_raw=trajectory.tomorrow_solar_raw,
-            solar_adjusted=trajectory.tomorrow_solar_adjusted,
-            forecast_error_pct=trajectory.forecast_error_pct,
-            deficit=trajectory.daily_deficit_kwh,
-            charge_needed=effective_charge,
-            usable_capacity=trajectory.usable_capacity_kwh,
-        )
-
         # Target SOC = projected SOC at window start + charge percentage
         # battery_at_window_start_kwh is usable kWh above min_soc
-        soc_at_ws = c.min_soc + (
-            trajectory.battery_at_window_start_kwh / c.battery_capacity * 100
+        soc_at_ws = ctx.min_soc + (
+            trajectory.battery_at_window_start_kwh / ctx.battery_capacity * 100
         )
-        charge_pct = effective_charge / c.battery_capacity * 100
-        target_soc = min(round(soc_at_ws + charge_pct, 1), c.max_charge_level)
+        charge_pct = effective_charge / ctx.battery_capacity * 100
+        target_soc = _clamp_target_soc(soc_at_ws + charge_pct, ctx.max_charge_level)
 
         schedule = ChargingSchedule(
             start_hour=window.start_hour,
@@ -478,8 +602,7 @@ class ChargingPlanner:
         Uses baseline consumption (avg minus surplus load energy) to avoid
         a feedback loop where surplus loads inflate consumption estimates.
         """
-        if now is None:
-            now = _default_now()
+        now = _now_or_default(now)
         c = self._coordinator
 
         daily_consumption = c.consumption_tracker.average(c.store.consumption_history)
@@ -498,9 +621,9 @@ class ChargingPlanner:
         # is fair at any point within the hour.
         live_scale = 1.0
         minute_fraction = now.minute / 60.0
-        forecast_so_far = sum(
-            solar_profile.get((0, h), 0.0) for h in range(now.hour)
-        ) + solar_profile.get((0, now.hour), 0.0) * minute_fraction
+        forecast_so_far = (
+            sum(solar_profile[: now.hour]) + solar_profile[now.hour] * minute_fraction
+        )
         actual_today = c.actual_solar_today
         if forecast_so_far > 0.5 and actual_today is not None:
             live_scale = min(actual_today / forecast_so_far, 1.5)
@@ -511,11 +634,13 @@ class ChargingPlanner:
         peak_surplus = 0.0
 
         # Simulate from now.hour through end of today
-        for hour in range(now.hour, 24):
+        weights = self._hourly_weights()
+        start_hour = now.hour
+        for hour in range(start_hour, 24):
             # For current hour, only count remaining fraction
-            hour_fraction = (1.0 - minute_fraction) if hour == now.hour else 1.0
-            cons = self._hourly_consumption(hour, daily_consumption) * hour_fraction
-            solar = solar_profile.get((0, hour), 0.0) * live_scale * hour_fraction
+            hour_fraction = (1.0 - minute_fraction) if hour == start_hour else 1.0
+            cons = daily_consumption * weights[hour] * hour_fraction
+            solar = solar_profile[hour] * live_scale * hour_fraction
 
             net = solar - cons
             soc_kwh += net
@@ -559,8 +684,7 @@ class ChargingPlanner:
 
         Approved if SOC never drops below min_soc during or after the load runs.
         """
-        if now is None:
-            now = _default_now()
+        now = _now_or_default(now)
         c = self._coordinator
 
         daily_consumption = c.consumption_tracker.average(c.store.consumption_history)
@@ -569,7 +693,8 @@ class ChargingPlanner:
             daily_consumption *= c.weekend_consumption_multiplier
 
         capacity = c.battery_capacity
-        min_soc_kwh = capacity * c.min_soc / 100
+        min_soc = c.min_soc
+        min_soc_kwh = capacity * min_soc / 100
         max_soc_kwh = capacity * c.max_charge_level / 100
         soc_kwh = capacity * c.current_soc / 100
 
@@ -590,30 +715,38 @@ class ChargingPlanner:
         reactive_claim_total = 0.0
         total_surplus = 0.0
         minute_fraction = now.minute / 60.0
+        weights = self._hourly_weights()
+        start_hour = now.hour
+        load_power = load.power_kw
+
+        # Reactive loads claim surplus by priority, each capped at its
+        # utilization-scaled power — invariant over the simulated hours
+        factors = utilization_factors or {}
+        reactive_caps = [
+            rl.power_kw * factors.get(rl.name, 1.0)
+            for rl in sorted(reactive_loads, key=lambda x: x.priority)
+        ]
 
-        for hour in range(now.hour, 24):
+        for hour in range(start_hour, 24):
             # For current hour, only simulate remaining fraction
-            hour_fraction = (1.0 - minute_fraction) if hour == now.hour else 1.0
-            cons = self._hourly_consumption(hour, daily_consumption) * hour_fraction
-            solar = solar_profile.get((0, hour), 0.0) * hour_fraction
+            hour_fraction = (1.0 - minute_fraction) if hour == start_hour else 1.0
+            cons = daily_consumption * weights[hour] * hour_fraction
+            solar = solar_profile[hour] * hour_fraction
 
             soc_kwh += solar - cons
 
             # Predictive load drains battery during its schedule
             if sched_start <= hour < sched_end:
-                soc_kwh -= load.power_kw * hour_fraction
+                soc_kwh -= load_power * hour_fraction
 
             # Battery overflow = surplus available for reactive loads
             if soc_kwh > max_soc_kwh:
                 overflow = soc_kwh - max_soc_kwh
                 soc_kwh = max_soc_kwh
 
-                # Reactive loads claim surplus by priority (scaled by utilization)
                 remaining = overflow
-                factors = utilization_factors or {}
-                for rl in sorted(reactive_loads, key=lambda x: x.priority):
-                    factor = factors.get(rl.name, 1.0)
-                    claim = min(remaining, rl.power_kw * factor)
+                for cap in reactive_caps:
+                    claim = min(remaining, cap)
                     reactive_claim_total += claim
                     remaining -= claim
                     if remaining <= 0:
@@ -638,7 +771,7 @@ class ChargingPlanner:
         if not approved:
             reason = (
                 f"Denied: min SOC would drop to {min_soc_pct:.0f}% "
-                f"(below {c.min_soc:.0f}%)"
+                f"(below {min_soc:.0f}%)"
             )
 
         # Check 2: Battery must recover enough for reactive loads to trigger
@@ -656,7 +789,7 @@ class ChargingPlanner:
         if approved:
             reason = (
                 f"Approved: surplus {surplus_budget:.1f} kWh, "
-                f"min SOC {min_soc_pct:.0f}% stays above {c.min_soc:.0f}%, "
+                f"min SOC {min_soc_pct:.0f}% stays above {min_soc:.0f}%, "
                 f"peak SOC {peak_soc_pct:.0f}%"
             )
 
@@ -677,11 +810,10 @@ class ChargingPlanner:
         charging would raise it but surplus is best estimated conservatively).
         Uses baseline consumption (avg minus surplus load energy).
         """
-        if now is None:
-            now = _default_now()
+        now = _now_or_default(now)
         c = self._coordinator
 
-        tomorrow = now + timedelta(days=1)
+        tomorrow = now + _ONE_DAY
         daily_consumption = c.consumption_tracker.average(c.store.consumption_history)
         daily_consumption = max(0.0, daily_consumption - self._avg_surplus_energy())
         if tomorrow.weekday() >= 5:
@@ -699,9 +831,10 @@ class ChargingPlanner:
         total_surplus = 0.0
         peak_surplus = 0.0
 
+        weights = self._hourly_weights()
         for hour in range(24):
-            cons = self._hourly_consumption(hour, daily_consumption)
-            solar = solar_profile.get((1, hour), 0.0)
+            cons = daily_consumption * weights[hour]
+            solar = solar_profile[24 + hour]
 
             net = solar - cons
             soc_kwh += net
@@ -5,11 +5,24 @@ No Home Assistant dependencies — fully unit-testable.
 
 from __future__ import annotations
 
+import heapq
 import math
+import re
+from bisect import bisect_right
+from collections.abc import Mapping
 from dataclasses import dataclass
+from itertools import accumulate
+from operator import itemgetter
+from typing import Any
 
+# Date and hour of a price attribute key, e.g. "2026-02-08T22:00:00+01:00"
+_PRICE_KEY_RE = re.compile(r"(\d{4}-\d{2}-\d{2}).(\d{2})")
 
-@dataclass
+# classify_price labels, one per band between the threshold edges
+_PRICE_CLASSES = ("Very Cheap", "Cheap", "Normal", "Expensive")
+
+
+@dataclass(frozen=True, slots=True)
 class PriceSlot:
     """A single hour price slot."""
 
@@ -17,7 +30,7 @@ class PriceSlot:
     price: float
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PriceWindow:
     """A contiguous window of hours with average price."""
 
@@ -38,6 +51,43 @@ class PriceAnalyzer:
     ) -> None:
         self._window_start = window_start_hour
         self._window_end = window_end_hour
+        # Total hours in the charging window (wraps past midnight when end <= start)
+        if window_end_hour <= window_start_hour:
+            self._window_size = (24 - window_start_hour) + window_end_hour
+        else:
+            self._window_size = window_end_hour - window_start_hour
+
+    def index_prices(
+        self, all_prices: Mapping[str, Any]
+    ) -> dict[str, dict[int, list[float]]]:
+        """Parse price attributes once into a {date: {hour: [prices]}} index.
+
+        Args:
+            all_prices: Dict mapping datetime strings to prices.
+                Keys are ISO format like "2026-02-08T00:00:00+01:00"
+                or "2026-02-08T00:00" etc.
+
+        Returns:
+            Prices keyed by "YYYY-MM-DD" then hour, every entry for the hour
+            in attribute order (one for hourly feeds, four for 15-minute ones).
+        """
+        index: dict[str, dict[int, list[float]]] = {}
+
+        match_key = _PRICE_KEY_RE.match
+        for key, value in all_prices.items():
+            # Expect format like "2026-02-08T22:00:00+01:00" or similar
+            m = match_key(str(key))
+            if m is None:
+                continue
+
+            try:
+                price = float(value)
+            except (ValueError, TypeError):
+                continue
+
+            index.setdefault(m[1], {}).setdefault(int(m[2]), []).append(price)
+
+        return index
 
     def extract_night_prices(
         self,
@@ -57,39 +107,46 @@ class PriceAnalyzer:
         Returns:
             List of PriceSlot for hours in the charging window.
         """
-        slots: list[PriceSlot] = []
-        seen_hours: set[int] = set()
+        return self.night_prices_from_index(
+            self.index_prices(all_prices), today_date, tomorrow_date
+        )
 
-        for key, value in all_prices.items():
-            key_str = str(key)
-            if len(key_str) < 13:
-                continue
-            # Expect format like "2026-02-08T22:00:00+01:00" or similar
-            if key_str[4:5] != "-" or key_str[7:8] != "-":
-                continue
+    def night_prices_from_index(
+        self,
+        index: Mapping[str, Mapping[int, list[float]]],
+        today_date: str,
+        tomorrow_date: str,
+    ) -> list[PriceSlot]:
+        """Select the night charging window from a parsed price index.
 
-            date_part = key_str[:10]
-            try:
-                hour = int(key_str[11:13])
-            except (ValueError, IndexError):
-                continue
+        Looks up tonight's hours (window_start-23) from today and the morning
+        hours (0 to window_end) from tomorrow directly, already in window order.
+        Each hour is priced by its first entry.
 
-            try:
-                price = float(value)
-            except (ValueError, TypeError):
-                continue
+        Args:
+            index: Output of index_prices().
+            today_date: Today's date as "YYYY-MM-DD".
+            tomorrow_date: Tomorrow's date as "YYYY-MM-DD".
 
-            # Tonight's hours (22-23) from today, morning hours (0-end) from tomorrow
-            if date_part == today_date and hour >= self._window_start:
-                if hour not in seen_hours:
-                    slots.append(PriceSlot(hour=hour, price=price))
-                    seen_hours.add(hour)
-            elif date_part == tomorrow_date and hour < self._window_end:
-                if hour not in seen_hours:
-                    slots.append(PriceSlot(hour=hour, price=price))
+        Returns:
+            List of PriceSlot for hours in the charging window.
+        """
+        slots: list[PriceSlot] = []
+        seen_hours: set[int] = set()
+        today = index.get(today_date, {})
+        tomorrow = index.get(tomorrow_date, {})
+
+        for day, hours in (
+            (today, range(self._window_start, 24)),
+            (tomorrow, range(self._window_end)),
+        ):
+            for hour in hours:
+                prices = day.get(hour)
+                if prices and hour not in seen_hours:
+                    slots.append(PriceSlot(hour=hour, price=prices[0]))
                     seen_hours.add(hour)
 
-        # Sort by hour, wrapping around midnight
+        # Sort by hour, wrapping around midnight (no-op unless start < end)
         slots.sort(key=lambda s: s.hour if s.hour >= self._window_start else s.hour + 24)
         return slots
 
@@ -108,65 +165,65 @@ class PriceAnalyzer:
         hours_float = required_kwh / charge_power_kw
         # H3: Round up to nearest integer (ceil)
         hours = max(1, math.ceil(hours_float))
-        max_window = self._get_window_size()
-        return min(hours, max_window)
+        return min(hours, self._window_size)
 
     def find_cheapest_window(
         self,
         slots: list[PriceSlot],
         window_hours: int,
+        prices: list[float] | None = None,
     ) -> PriceWindow | None:
         """Find the cheapest contiguous window of the given length.
 
         Args:
             slots: Available price slots (must be sorted).
             window_hours: Number of contiguous hours needed.
+            prices: Optional prices parallel to `slots`, if the caller
+                already extracted them.
 
         Returns:
             The cheapest PriceWindow, or None if not enough slots.
         """
         if not slots or window_hours <= 0 or len(slots) < window_hours:
             return None
-
-        # Build ordered hour sequence for the window
-        ordered_hours = []
-        for slot in slots:
-            normalized = slot.hour if slot.hour >= self._window_start else slot.hour + 24
-            ordered_hours.append(normalized)
-
-        best: PriceWindow | None = None
-
-        for i in range(len(slots) - window_hours + 1):
-            window_slots = slots[i : i + window_hours]
-
-            # Check contiguity
-            is_contiguous = True
-            for j in range(1, len(window_slots)):
-                expected = ordered_hours[i + j - 1] + 1
-                actual = ordered_hours[i + j]
-                if actual != expected:
-                    is_contiguous = False
-                    break
-
-            if not is_contiguous:
+        if prices is None:
+            prices = [slot.price for slot in slots]
+
+        # Hours on one axis across midnight (e.g. 22, 23, 24, 25 …); a window
+        # is contiguous when its last hour is exactly window_hours - 1 later
+        window_start = self._window_start
+        norm_hours = [
+            slot.hour if slot.hour >= window_start else slot.hour + 24 for slot in slots
+        ]
+        # cumsum[k] = sum(prices[:k]), so any window sum is one subtraction
+        cumsum = list(accumulate(prices, initial=0.0))
+
+        # Single scan over start indices; only the winner becomes a PriceWindow
+        span = window_hours - 1
+        best_index: int | None = None
+        best_avg = 0.0
+        for i in range(len(slots) - span):
+            if norm_hours[i + span] - norm_hours[i] != span:
                 continue
 
-            avg_price = sum(s.price for s in window_slots) / window_hours
-            start_hour = window_slots[0].hour
-            end_hour = (window_slots[-1].hour + 1) % 24
-
-            window = PriceWindow(
-                start_hour=start_hour,
-                end_hour=end_hour,
-                window_hours=window_hours,
-                avg_price=round(avg_price, 4),
-                prices=window_slots,
-            )
+            # Round before comparing: prefix-sum float noise must not break
+            # exact ties, where the earliest window wins
+            avg_price = round((cumsum[i + window_hours] - cumsum[i]) / window_hours, 4)
+            if best_index is None or avg_price < best_avg:
+                best_index = i
+                best_avg = avg_price
 
-            if best is None or avg_price < best.avg_price:
-                best = window
+        if best_index is None:
+            return None
 
-        return best
+        window_slots = slots[best_index : best_index + window_hours]
+        return PriceWindow(
+            start_hour=window_slots[0].hour,
+            end_hour=(window_slots[-1].hour + 1) % 24,
+            window_hours=window_hours,
+            avg_price=best_avg,
+            prices=window_slots,
+        )
 
     def find_cheapest_hours(
         self,
@@ -184,27 +241,61 @@ class PriceAnalyzer:
         Returns:
             List of PriceSlot sorted by price (cheapest first).
         """
-        day_slots: list[PriceSlot] = []
+        return self.cheapest_hours_from_index(
+            self.index_prices(all_prices), target_date, n
+        )
 
-        for key, value in all_prices.items():
-            key_str = str(key)
-            if len(key_str) < 13:
-                continue
-            if key_str[4:5] != "-" or key_str[7:8] != "-":
-                continue
-            if key_str[:10] != target_date:
-                continue
+    def cheapest_hours_from_index(
+        self,
+        index: Mapping[str, Mapping[int, list[float]]],
+        target_date: str,
+        n: int = 3,
+    ) -> list[PriceSlot]:
+        """Find the N cheapest hours for a given date in a parsed price index.
 
-            try:
-                hour = int(key_str[11:13])
-                price = float(value)
-            except (ValueError, TypeError, IndexError):
-                continue
+        Args:
+            index: Output of index_prices().
+            target_date: Date as "YYYY-MM-DD".
+            n: Number of cheapest hours to return.
+
+        Returns:
+            List of PriceSlot sorted by price (cheapest first). Sub-hourly
+            feeds contribute one slot per entry, so an hour can repeat.
+        """
+        day = index.get(target_date, {})
+        entries = ((hour, price) for hour, prices in day.items() for price in prices)
+        # Partial selection: only the n winners are ordered, not the whole day
+        return [
+            PriceSlot(hour=hour, price=price)
+            for hour, price in heapq.nsmallest(n, entries, key=itemgetter(1))
+        ]
+
+    def average_price_from_index(
+        self,
+        index: Mapping[str, Mapping[int, list[float]]],
+        target_date: str,
+        start_hour: int,
+        end_hour: int,
+    ) -> float | None:
+        """Average every price slot of a date in hours [start_hour, end_hour).
 
-            day_slots.append(PriceSlot(hour=hour, price=price))
+        Args:
+            index: Output of index_prices().
+            target_date: Date as "YYYY-MM-DD".
+            start_hour: First hour included.
+            end_hour: First hour excluded.
 
-        day_slots.sort(key=lambda s: s.price)
-        return day_slots[:n]
+        Returns:
+            The mean over all entries (each quarter-hour counts for 15-minute
+            feeds), or None when the date has no prices in those hours.
+        """
+        day = index.get(target_date, {})
+        prices = [
+            price for hour, slots in day.items() if start_hour <= hour < end_hour for price in slots
+        ]
+        if not prices:
+            return None
+        return sum(prices) / len(prices)
 
     def classify_price(
         self,
@@ -217,16 +308,6 @@ class PriceAnalyzer:
         """
         if charge_threshold <= 0:
             return "Normal"
-        if current_price < charge_threshold * 0.7:
-            return "Very Cheap"
-        if current_price < charge_threshold:
-            return "Cheap"
-        if current_price < charge_threshold * 1.5:
-            return "Normal"
-        return "Expensive"
-
-    def _get_window_size(self) -> int:
-        """Get total hours in the charging window."""
-        if self._window_end <= self._window_start:
-            return (24 - self._window_start) + self._window_end
-        return self._window_end - self._window_start
+        # An edge value falls into the band above it
+        edges = (charge_threshold * 0.7, charge_threshold, charge_threshold * 1.5)
+        return _PRICE_CLASSES[bisect_right(edges, current_price)]
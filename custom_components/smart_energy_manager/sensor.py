@@ -374,6 +374,10 @@ class SmartBatterySensor(
     ) -> None:
         super().__init__(coordinator)
         self.entity_description = description
+        # value_fn/attrs_fn results and the coordinator data dict they came from
+        self._view_source: dict[str, Any] | None = None
+        self._value: Any = None
+        self._attrs: dict[str, Any] | None = None
         self._attr_unique_id = f"{entry.entry_id}_{description.key}"
         self._attr_device_info = {
             "identifiers": {(DOMAIN, entry.entry_id)},
@@ -388,16 +392,31 @@ class SmartBatterySensor(
             unit = currency.split("/")[0] if "/" in currency else currency
             self._attr_native_unit_of_measurement = unit
 
+    def _refresh_view(self) -> None:
+        """Evaluate value_fn and attrs_fn together, once per coordinator refresh.
+
+        The coordinator publishes a fresh data dict per refresh, so an
+        identity check tells whether the cached results are still current.
+        """
+        data = self.coordinator.data
+        if data is self._view_source:
+            return
+        description = self.entity_description
+        if data is None:
+            self._value = self._attrs = None
+        else:
+            self._value = description.value_fn(data)
+            self._attrs = description.attrs_fn(data) if description.attrs_fn else None
+        self._view_source = data
+
     @property
     def native_value(self) -> Any:
         """Return the sensor value."""
-        if self.coordinator.data is None:
-            return None
-        return self.entity_description.value_fn(self.coordinator.data)
+        self._refresh_view()
+        return self._value
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return additional attributes."""
-        if self.coordinator.data is None or self.entity_description.attrs_fn is None:
-            return None
-        return self.entity_description.attrs_fn(self.coordinator.data)
+        self._refresh_view()
+        return self._attrs
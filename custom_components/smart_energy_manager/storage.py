@@ -7,9 +7,10 @@ proper structured JSON stored in HA's .storage directory.
 from __future__ import annotations
 
 import logging
+from collections.abc import Sequence
 from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.storage import Store
 
 from .const import (
@@ -28,28 +29,42 @@ _LOGGER = logging.getLogger(__name__)
 
 STORAGE_VERSION = 1
 STORAGE_KEY_PREFIX = DOMAIN
+# Seconds to coalesce setter writes into a single save
+SAVE_DELAY = 10
+
+# Small, frequently written keys kept in their own file (…<entry_id>.state)
+# so routine state updates do not rewrite the day-by-day histories
+_STATE_KEYS = frozenset(
+    {"last_session", "enabled", "charging_state", "current_schedule", "surplus_load_states"}
+)
 
 
 def _default_data() -> dict[str, Any]:
     """Return default storage data."""
     return {
-        "consumption_history": [],
-        "charge_history": [],
-        "forecast_error_history": [],
+        "consumption_history": (),
+        "charge_history": (),
+        "forecast_error_history": (),
         "last_session": None,
         "enabled": True,
         "charging_state": "idle",
         "current_schedule": None,
-        "morning_soc_history": [],
-        "session_cost_history": [],
-        "bms_capacity_history": [],
+        "morning_soc_history": (),
+        "session_cost_history": (),
+        "bms_capacity_history": (),
         "surplus_load_states": {},
-        "surplus_runtime_history": [],
+        "surplus_runtime_history": (),
     }
 
 
 class SmartBatteryStore:
-    """Manages persistent storage for the integration."""
+    """Manages persistent storage for the integration.
+
+    Histories are stored as tuples, so their properties return the stored
+    objects without copying and callers cannot change them in place.
+    State properties also return the stored objects; treat them as
+    read-only and pass a new value to the matching async_set_* method.
+    """
 
     def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
         self._store = Store(
@@ -57,15 +72,31 @@ class SmartBatteryStore:
             STORAGE_VERSION,
             f"{STORAGE_KEY_PREFIX}.{entry_id}",
         )
+        self._state_store = Store(
+            hass,
+            STORAGE_VERSION,
+            f"{STORAGE_KEY_PREFIX}.{entry_id}.state",
+        )
         self._data: dict[str, Any] = _default_data()
+        # (stored dict, session built from it), keyed by identity
+        self._last_session_cache: tuple[dict | None, ChargingSession | None] = (None, None)
 
     async def async_load(self) -> None:
-        """Load data from storage."""
-        stored = await self._store.async_load()
-        if stored:
-            self._data = {**_default_data(), **stored}
-        else:
-            self._data = _default_data()
+        """Load data from storage.
+
+        Before the state keys moved to their own file they lived in the
+        main document; the state file wins once it exists.
+        """
+        stored = await self._store.async_load() or {}
+        stored_state = await self._state_store.async_load()
+        self._data = {**_default_data(), **stored, **(stored_state or {})}
+        # JSON loads histories as lists; keep them as tuples
+        for key, value in self._data.items():
+            if isinstance(value, list):
+                self._data[key] = tuple(value)
+        if stored_state is None:
+            # Write the state file before a history save drops its keys
+            self._state_store.async_delay_save(self._state_to_save, SAVE_DELAY)
         self._migrate_surplus_hours()
         _LOGGER.debug("Loaded storage data: %s entries", len(self._data))
 
@@ -83,54 +114,97 @@ class SmartBatteryStore:
             _LOGGER.info("Migrated surplus_hours for historical entries")
 
     async def async_save(self) -> None:
-        """Save data to storage."""
-        await self._store.async_save(self._data)
+        """Save data to storage now, replacing any pending delayed writes."""
+        await self._store.async_save(self._history_to_save())
+        await self._state_store.async_save(self._state_to_save())
+
+    @callback
+    def _async_set(self, key: str, value: Any) -> None:
+        """Store `value` under `key` and schedule a save of the file holding it.
+
+        Saves are delayed by SAVE_DELAY to coalesce bursts of setter calls.
+        HA's Store flushes pending delayed writes on shutdown; unload calls
+        async_save so a reload reads the latest data.
+
+        A new value equal to the stored one is a no-op. Passing the stored
+        object itself always saves, since it may have been changed in place.
+        """
+        current = self._data.get(key)
+        if current is not value and current == value:
+            return
+        self._data[key] = value
+        if key in _STATE_KEYS:
+            self._state_store.async_delay_save(self._state_to_save, SAVE_DELAY)
+        else:
+            self._store.async_delay_save(self._history_to_save, SAVE_DELAY)
+
+    @callback
+    def _async_prepend(self, key: str, entry: Any, limit: int) -> None:
+        """Add `entry` as the newest item of a bounded history and persist.
+
+        Builds the new tuple in one pass instead of concatenating and then
+        slicing.
+        """
+        self._async_set(key, (entry, *self._data.get(key, ())[: limit - 1]))
+
+    @callback
+    def _history_to_save(self) -> dict[str, Any]:
+        """Return the main (history) document, read at write time."""
+        return {k: v for k, v in self._data.items() if k not in _STATE_KEYS}
+
+    @callback
+    def _state_to_save(self) -> dict[str, Any]:
+        """Return the state document, read at write time."""
+        return {k: v for k, v in self._data.items() if k in _STATE_KEYS}
 
     # --- Consumption History ---
 
     @property
-    def consumption_history(self) -> list[float]:
+    def consumption_history(self) -> tuple[float, ...]:
         """Return daily consumption history (most recent first)."""
-        return list(self._data.get("consumption_history", []))
+        return self._data.get("consumption_history", ())
 
-    async def async_set_consumption_history(self, history: list[float]) -> None:
+    async def async_set_consumption_history(self, history: Sequence[float]) -> None:
         """Set the full consumption history and persist."""
-        self._data["consumption_history"] = history[:CONSUMPTION_WINDOW_DAYS]
-        await self.async_save()
+        self._async_set("consumption_history", tuple(history[:CONSUMPTION_WINDOW_DAYS]))
 
     # --- Charge History ---
 
     @property
-    def charge_history(self) -> list[float]:
+    def charge_history(self) -> tuple[float, ...]:
         """Return daily charge history in kWh (most recent first)."""
-        return list(self._data.get("charge_history", []))
+        return self._data.get("charge_history", ())
 
-    async def async_set_charge_history(self, history: list[float]) -> None:
+    async def async_set_charge_history(self, history: Sequence[float]) -> None:
         """Set the full charge history and persist."""
-        self._data["charge_history"] = history[:CHARGE_HISTORY_DAYS]
-        await self.async_save()
+        self._async_set("charge_history", tuple(history[:CHARGE_HISTORY_DAYS]))
 
     # --- Forecast Error History ---
 
     @property
-    def forecast_error_history(self) -> list[float]:
+    def forecast_error_history(self) -> tuple[float, ...]:
         """Return forecast error history (most recent first)."""
-        return list(self._data.get("forecast_error_history", []))
+        return self._data.get("forecast_error_history", ())
 
-    async def async_set_forecast_error_history(self, history: list[float]) -> None:
+    async def async_set_forecast_error_history(self, history: Sequence[float]) -> None:
         """Set the full forecast error history and persist."""
-        self._data["forecast_error_history"] = history[:FORECAST_ERROR_WINDOW_DAYS]
-        await self.async_save()
+        self._async_set("forecast_error_history", tuple(history[:FORECAST_ERROR_WINDOW_DAYS]))
 
     # --- Last Session ---
 
     @property
     def last_session(self) -> ChargingSession | None:
-        """Return the last charging session."""
+        """Return the last charging session.
+
+        Built once per stored dict; like the histories, treat it as read-only.
+        """
         data = self._data.get("last_session")
         if not data:
             return None
-        return ChargingSession(
+        source, session = self._last_session_cache
+        if source is data:
+            return session
+        session = ChargingSession(
             start_soc=data.get("start_soc", 0.0),
             end_soc=data.get("end_soc", 0.0),
             start_time=data.get("start_time", ""),
@@ -138,18 +212,22 @@ class SmartBatteryStore:
             avg_price=data.get("avg_price", 0.0),
             result=data.get("result", ""),
         )
+        self._last_session_cache = (data, session)
+        return session
 
     async def async_set_last_session(self, session: ChargingSession) -> None:
         """Set the last charging session and persist."""
-        self._data["last_session"] = {
-            "start_soc": session.start_soc,
-            "end_soc": session.end_soc,
-            "start_time": session.start_time,
-            "end_time": session.end_time,
-            "avg_price": session.avg_price,
-            "result": session.result,
-        }
-        await self.async_save()
+        self._async_set(
+            "last_session",
+            {
+                "start_soc": session.start_soc,
+                "end_soc": session.end_soc,
+                "start_time": session.start_time,
+                "end_time": session.end_time,
+                "avg_price": session.avg_price,
+                "result": session.result,
+            },
+        )
 
     # --- Enabled State ---
 
@@ -160,8 +238,7 @@ class SmartBatteryStore:
 
     async def async_set_enabled(self, value: bool) -> None:
         """Set the enabled state and persist."""
-        self._data["enabled"] = value
-        await self.async_save()
+        self._async_set("enabled", value)
 
     # --- Charging State (C1) ---
 
@@ -172,8 +249,7 @@ class SmartBatteryStore:
 
     async def async_set_charging_state(self, state: str) -> None:
         """Set the charging state and persist."""
-        self._data["charging_state"] = state
-        await self.async_save()
+        self._async_set("charging_state", state)
 
     # --- Current Schedule (C1) ---
 
@@ -184,69 +260,80 @@ class SmartBatteryStore:
 
     async def async_set_current_schedule(self, schedule_dict: dict[str, Any] | None) -> None:
         """Set the current schedule dict and persist."""
-        self._data["current_schedule"] = schedule_dict
-        await self.async_save()
+        self._async_set("current_schedule", schedule_dict)
 
     # --- Morning SOC History ---
 
     @property
-    def morning_soc_history(self) -> list[dict]:
+    def morning_soc_history(self) -> tuple[dict, ...]:
         """Return morning SOC history (most recent first)."""
-        return list(self._data.get("morning_soc_history", []))
+        return self._data.get("morning_soc_history", ())
 
-    async def async_set_morning_soc_history(self, history: list[dict]) -> None:
+    async def async_set_morning_soc_history(self, history: Sequence[dict]) -> None:
         """Set the morning SOC history and persist."""
-        self._data["morning_soc_history"] = history[:MORNING_SOC_HISTORY_DAYS]
-        await self.async_save()
+        self._async_set("morning_soc_history", tuple(history[:MORNING_SOC_HISTORY_DAYS]))
+
+    async def async_add_morning_soc(self, entry: dict) -> None:
+        """Prepend a morning SOC entry, dropping the oldest beyond the window."""
+        self._async_prepend("morning_soc_history", entry, MORNING_SOC_HISTORY_DAYS)
 
     # --- Session Cost History ---
 
     @property
-    def session_cost_history(self) -> list[dict]:
+    def session_cost_history(self) -> tuple[dict, ...]:
         """Return session cost history (most recent first)."""
-        return list(self._data.get("session_cost_history", []))
+        return self._data.get("session_cost_history", ())
 
-    async def async_set_session_cost_history(self, history: list[dict]) -> None:
+    async def async_set_session_cost_history(self, history: Sequence[dict]) -> None:
         """Set the session cost history and persist."""
-        self._data["session_cost_history"] = history[:SESSION_COST_HISTORY_DAYS]
-        await self.async_save()
+        self._async_set("session_cost_history", tuple(history[:SESSION_COST_HISTORY_DAYS]))
+
+    async def async_add_session_cost(self, entry: dict) -> None:
+        """Prepend a session cost entry, dropping the oldest beyond the window."""
+        self._async_prepend("session_cost_history", entry, SESSION_COST_HISTORY_DAYS)
 
     # --- BMS Capacity History ---
 
     @property
-    def bms_capacity_history(self) -> list[dict]:
+    def bms_capacity_history(self) -> tuple[dict, ...]:
         """Return BMS capacity history (most recent first)."""
-        return list(self._data.get("bms_capacity_history", []))
+        return self._data.get("bms_capacity_history", ())
 
-    async def async_set_bms_capacity_history(self, history: list[dict]) -> None:
+    async def async_set_bms_capacity_history(self, history: Sequence[dict]) -> None:
         """Set the BMS capacity history and persist."""
-        self._data["bms_capacity_history"] = history[:BMS_CAPACITY_HISTORY_DAYS]
-        await self.async_save()
+        self._async_set("bms_capacity_history", tuple(history[:BMS_CAPACITY_HISTORY_DAYS]))
+
+    async def async_add_bms_capacity(self, entry: dict) -> None:
+        """Prepend a BMS capacity entry, dropping the oldest beyond the window."""
+        self._async_prepend("bms_capacity_history", entry, BMS_CAPACITY_HISTORY_DAYS)
 
     # --- Surplus Load States ---
 
     @property
     def surplus_load_states(self) -> dict:
         """Return persisted surplus load states."""
-        return dict(self._data.get("surplus_load_states", {}))
+        return self._data.get("surplus_load_states", {})
 
     async def async_set_surplus_load_states(self, states: dict) -> None:
         """Set surplus load states and persist."""
-        self._data["surplus_load_states"] = states
-        await self.async_save()
+        self._async_set("surplus_load_states", states)
 
     # --- Surplus Runtime History ---
 
     @property
-    def surplus_runtime_history(self) -> list[dict]:
+    def surplus_runtime_history(self) -> tuple[dict, ...]:
         """Return surplus runtime history (most recent first)."""
-        return list(self._data.get("surplus_runtime_history", []))
+        return self._data.get("surplus_runtime_history", ())
 
-    async def async_set_surplus_runtime_history(self, history: list[dict]) -> None:
+    async def async_set_surplus_runtime_history(self, history: Sequence[dict]) -> None:
         """Set surplus runtime history and persist."""
-        self._data["surplus_runtime_history"] = history[:SURPLUS_RUNTIME_HISTORY_DAYS]
-        await self.async_save()
+        self._async_set("surplus_runtime_history", tuple(history[:SURPLUS_RUNTIME_HISTORY_DAYS]))
+
+    async def async_add_surplus_runtime(self, entry: dict) -> None:
+        """Prepend a surplus runtime entry, dropping the oldest beyond the window."""
+        self._async_prepend("surplus_runtime_history", entry, SURPLUS_RUNTIME_HISTORY_DAYS)
 
     async def async_remove(self) -> None:
-        """Remove the storage file."""
+        """Remove the storage files."""
         await self._store.async_remove()
+        await self._state_store.async_remove()
@@ -810,7 +810,7 @@ class SurplusLoadController:
         ), 2)
 
         # Build today's in-progress entry for the runtime history chart
-        today_str = dt_util.now().strftime("%Y-%m-%d")
+        today_str = dt_util.now().date().isoformat()
         today_runtime: dict[str, float] = {}
         today_energy: dict[str, float] = {}
         for cfg in self._configs:
@@ -829,9 +829,9 @@ class SurplusLoadController:
         history = self._coordinator.store.surplus_runtime_history
         # Prepend today's live data (replace if midnight already recorded today)
         if history and history[0].get("date") == today_str:
-            runtime_history = [today_entry] + history[1:]
+            runtime_history = [today_entry, *history[1:]]
         else:
-            runtime_history = [today_entry] + history
+            runtime_history = [today_entry, *history]
 
         return {
             "surplus_active_loads": len(active_loads),
@@ -27,6 +27,8 @@ class SmartBatterySwitch(SwitchEntity):
     _attr_has_entity_name = True
     _attr_translation_key = "enabled"
     _attr_icon = "mdi:power"
+    # State only changes through turn_on/turn_off, which write it
+    _attr_should_poll = False
 
     def __init__(
         self,
@@ -13,10 +13,11 @@ Or pipe via SSH:
 """
 
 import json
-import glob
 import sys
+from pathlib import Path
 
-STORE_PATTERN = "/config/.storage/smart_battery_charging.*"
+STORAGE_DIR = Path("/config/.storage")
+STORE_PATTERN = "smart_battery_charging.*"
 SESSION_COST_HISTORY = [
     {"date": "2026-02-26", "kwh": 2.76, "avg_price": 1.86, "cost": 5.13},
     {"date": "2026-02-24", "kwh": 5.7, "avg_price": 2.11, "cost": 12.03},
@@ -27,36 +28,30 @@ SESSION_COST_HISTORY = [
 
 
 def main():
-    files = glob.glob(STORE_PATTERN)
+    # Histories live in the main file; <entry_id>.state holds only state keys
+    files = [p for p in STORAGE_DIR.glob(STORE_PATTERN) if p.suffix != ".state"]
     if not files:
-        print("ERROR: No store file found matching %s" % STORE_PATTERN)
+        print("ERROR: No store file found matching %s" % (STORAGE_DIR / STORE_PATTERN))
         sys.exit(1)
 
     for path in files:
         print("Updating: %s" % path)
-        with open(path) as f:
-            store = json.load(f)
+        store = json.loads(path.read_text())
 
         data = store.get("data", {})
         existing = data.get("session_cost_history", [])
         existing_dates = {e.get("date") for e in existing}
 
-        # Merge: keep existing entries, add missing ones
-        added = 0
-        for entry in SESSION_COST_HISTORY:
-            if entry["date"] not in existing_dates:
-                existing.append(entry)
-                added += 1
-
-        # Sort newest first
-        existing.sort(key=lambda x: x.get("date", ""), reverse=True)
-        data["session_cost_history"] = existing
+        # Merge: keep existing entries (a day may hold several sessions),
+        # add backfill entries for dates not yet recorded
+        missing = [e for e in SESSION_COST_HISTORY if e["date"] not in existing_dates]
+        history = sorted(existing + missing, key=lambda x: x.get("date", ""), reverse=True)
+        data["session_cost_history"] = history
         store["data"] = data
 
-        with open(path, "w") as f:
-            json.dump(store, f, indent=2, ensure_ascii=False)
+        path.write_text(json.dumps(store, indent=2, ensure_ascii=False))
 
-        print("  Added %d entries, total now %d" % (added, len(existing)))
+        print("  Added %d entries, total now %d" % (len(missing), len(history)))
 
     print("\nDone. Restart HA to pick up the changes:")
     print("  ha core restart")
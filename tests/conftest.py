@@ -1,17 +1,52 @@
 """Shared test fixtures for Smart Battery Charging tests.
 
 Import pure logic modules directly to avoid triggering HA imports from __init__.py.
+Modules that do need HA import it from the package against the stubs below.
 """
 
 from __future__ import annotations
 
 import sys
+from collections.abc import Mapping
 from pathlib import Path
+from types import MappingProxyType
+from unittest.mock import MagicMock
 
 import pytest
 
+# Stub HA modules once per session, before any test module imports the package
+_HA_STUB_MODULES = (
+    "homeassistant",
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers",
+    "homeassistant.helpers.update_coordinator",
+    "homeassistant.helpers.storage",
+    "homeassistant.helpers.entity_platform",
+    "homeassistant.helpers.selector",
+    "homeassistant.helpers.event",
+    "homeassistant.components",
+    "homeassistant.components.switch",
+    "homeassistant.components.sensor",
+    "homeassistant.components.binary_sensor",
+    "homeassistant.components.number",
+    "homeassistant.data_entry_flow",
+    "homeassistant.util",
+    "homeassistant.util.dt",
+    "voluptuous",
+)
+for _mod_name in _HA_STUB_MODULES:
+    sys.modules.setdefault(_mod_name, MagicMock())
+# @callback only tags the function in HA; keep decorated methods callable on the stub
+if isinstance(sys.modules["homeassistant.core"], MagicMock):
+    sys.modules["homeassistant.core"].callback = lambda func: func
+
+# Add custom_components so HA-facing modules import as a package (relative imports work)
+_COMPONENTS_DIR = Path(__file__).parent.parent / "custom_components"
+sys.path.insert(0, str(_COMPONENTS_DIR))
+
 # Add the component directory to the path so we can import pure-logic modules directly
-_COMPONENT_DIR = Path(__file__).parent.parent / "custom_components" / "smart_energy_manager"
+_COMPONENT_DIR = _COMPONENTS_DIR / "smart_energy_manager"
 sys.path.insert(0, str(_COMPONENT_DIR))
 
 from consumption_tracker import ConsumptionTracker
@@ -37,26 +72,30 @@ def consumption_tracker() -> ConsumptionTracker:
     return ConsumptionTracker(window_days=7, fallback_kwh=20.0)
 
 
-@pytest.fixture
-def sample_prices() -> dict[str, float]:
+# Shared across the session; read-only so no test can leak changes into another
+_SAMPLE_PRICES: Mapping[str, float] = MappingProxyType({
+    # Today's evening prices
+    "2026-02-08T20:00:00+01:00": 3.5,
+    "2026-02-08T21:00:00+01:00": 3.2,
+    "2026-02-08T22:00:00+01:00": 2.1,
+    "2026-02-08T23:00:00+01:00": 1.8,
+    # Tomorrow's morning prices
+    "2026-02-09T00:00:00+01:00": 1.5,
+    "2026-02-09T01:00:00+01:00": 1.2,
+    "2026-02-09T02:00:00+01:00": 1.4,
+    "2026-02-09T03:00:00+01:00": 1.9,
+    "2026-02-09T04:00:00+01:00": 2.3,
+    "2026-02-09T05:00:00+01:00": 2.8,
+    # Tomorrow's daytime prices
+    "2026-02-09T06:00:00+01:00": 3.1,
+    "2026-02-09T07:00:00+01:00": 3.5,
+    "2026-02-09T08:00:00+01:00": 4.0,
+    "2026-02-09T12:00:00+01:00": 3.8,
+    "2026-02-09T18:00:00+01:00": 4.5,
+})
+
+
+@pytest.fixture(scope="session")
+def sample_prices() -> Mapping[str, float]:
     """Return a realistic set of hourly electricity prices."""
-    return {
-        # Today's evening prices
-        "2026-02-08T20:00:00+01:00": 3.5,
-        "2026-02-08T21:00:00+01:00": 3.2,
-        "2026-02-08T22:00:00+01:00": 2.1,
-        "2026-02-08T23:00:00+01:00": 1.8,
-        # Tomorrow's morning prices
-        "2026-02-09T00:00:00+01:00": 1.5,
-        "2026-02-09T01:00:00+01:00": 1.2,
-        "2026-02-09T02:00:00+01:00": 1.4,
-        "2026-02-09T03:00:00+01:00": 1.9,
-        "2026-02-09T04:00:00+01:00": 2.3,
-        "2026-02-09T05:00:00+01:00": 2.8,
-        # Tomorrow's daytime prices
-        "2026-02-09T06:00:00+01:00": 3.1,
-        "2026-02-09T07:00:00+01:00": 3.5,
-        "2026-02-09T08:00:00+01:00": 4.0,
-        "2026-02-09T12:00:00+01:00": 3.8,
-        "2026-02-09T18:00:00+01:00": 4.5,
-    }
+    return _SAMPLE_PRICES
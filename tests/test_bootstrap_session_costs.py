@@ -0,0 +1,46 @@
+"""Tests for the session cost bootstrap migration script."""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "migration"))
+
+import bootstrap_session_costs
+
+
+def _write_store(directory, history):
+    """Write a main store file holding `history`; return its path."""
+    path = directory / "smart_battery_charging.entry1"
+    path.write_text(json.dumps({"data": {"session_cost_history": history}}))
+    return path
+
+
+class TestBootstrapMerge:
+    """Test merging the backfill into an existing store file."""
+
+    def test_keeps_dateless_entry(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(bootstrap_session_costs, "STORAGE_DIR", tmp_path)
+        dateless = {"kwh": 1.0, "avg_price": 2.0, "cost": 2.0}
+        path = _write_store(tmp_path, [dateless])
+
+        bootstrap_session_costs.main()
+
+        history = json.loads(path.read_text())["data"]["session_cost_history"]
+        assert len(history) == len(bootstrap_session_costs.SESSION_COST_HISTORY) + 1
+        # Sorts as the empty date, so it ends up oldest
+        assert history[-1] == dateless
+        assert history[0]["date"] == "2026-02-26"
+
+    def test_skips_dates_already_recorded(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(bootstrap_session_costs, "STORAGE_DIR", tmp_path)
+        recorded = {"date": "2026-02-24", "kwh": 3.0, "avg_price": 1.0, "cost": 3.0}
+        path = _write_store(tmp_path, [recorded])
+
+        bootstrap_session_costs.main()
+
+        history = json.loads(path.read_text())["data"]["session_cost_history"]
+        on_day = [e for e in history if e["date"] == "2026-02-24"]
+        assert on_day == [recorded]
@@ -2,43 +2,19 @@
 
 from __future__ import annotations
 
-import sys
 from datetime import datetime
-from pathlib import Path
-from unittest.mock import AsyncMock, MagicMock, PropertyMock, patch
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
-# Mock HA modules before importing
-for mod_name in [
-    "homeassistant",
-    "homeassistant.core",
-    "homeassistant.config_entries",
-    "homeassistant.helpers",
-    "homeassistant.helpers.update_coordinator",
-    "homeassistant.helpers.storage",
-    "homeassistant.helpers.entity_platform",
-    "homeassistant.helpers.selector",
-    "homeassistant.helpers.event",
-    "homeassistant.components",
-    "homeassistant.components.switch",
-    "homeassistant.components.sensor",
-    "homeassistant.components.binary_sensor",
-    "homeassistant.components.number",
-    "homeassistant.data_entry_flow",
-    "homeassistant.util",
-    "homeassistant.util.dt",
-    "voluptuous",
-]:
-    sys.modules.setdefault(mod_name, MagicMock())
-
-_COMPONENTS_DIR = Path(__file__).parent.parent / "custom_components"
-sys.path.insert(0, str(_COMPONENTS_DIR))
-
 from smart_energy_manager.charging_controller import ChargingStateMachine
 from smart_energy_manager.const import STALL_ABORT_TICKS, STALL_RETRY_TICKS, START_FAILURE_MAX_RETRIES
 from smart_energy_manager.models import ChargingSchedule, ChargingState
 
+# Times shared by most tick tests; both fall inside the default 01-03 window
+_T_0130 = datetime(2026, 2, 15, 1, 30)
+_T_0200 = datetime(2026, 2, 15, 2, 0)
+
 
 def _make_schedule(start_hour=1, end_hour=3, target_soc=80.0, avg_price=1.5):
     """Create a test schedule."""
@@ -91,9 +67,9 @@ def _make_inverter():
 class TestOnPlan:
     """Test plan handling."""
 
-    @pytest.mark.asyncio
-    async def test_idle_with_schedule_goes_to_scheduled(self):
-        coord = _make_coordinator(state=ChargingState.IDLE)
+    @pytest.mark.parametrize("state", [ChargingState.IDLE, ChargingState.COMPLETE])
+    async def test_schedule_goes_to_scheduled(self, state):
+        coord = _make_coordinator(state=state)
         inv = _make_inverter()
         sm = ChargingStateMachine(coord, inv)
 
@@ -103,7 +79,6 @@ class TestOnPlan:
         assert coord.charging_state == ChargingState.SCHEDULED
         assert coord.current_schedule == schedule
 
-    @pytest.mark.asyncio
     async def test_idle_with_none_stays_idle(self):
         coord = _make_coordinator(state=ChargingState.IDLE)
         inv = _make_inverter()
@@ -117,30 +92,16 @@ class TestOnPlan:
         session = coord.store.async_set_last_session.call_args[0][0]
         assert session.result == "No charging needed"
 
-    @pytest.mark.asyncio
-    async def test_complete_with_schedule_goes_to_scheduled(self):
-        coord = _make_coordinator(state=ChargingState.COMPLETE)
-        inv = _make_inverter()
-        sm = ChargingStateMachine(coord, inv)
-
-        schedule = _make_schedule()
-        await sm.async_on_plan(schedule)
-
-        assert coord.charging_state == ChargingState.SCHEDULED
-
-    @pytest.mark.asyncio
     async def test_charging_ignores_new_plan(self):
         coord = _make_coordinator(state=ChargingState.CHARGING)
         inv = _make_inverter()
         sm = ChargingStateMachine(coord, inv)
 
-        schedule = _make_schedule()
-        await sm.async_on_plan(schedule)
+        await sm.async_on_plan(_make_schedule())
 
         # Should stay in CHARGING
         assert coord.charging_state == ChargingState.CHARGING
 
-    @pytest.mark.asyncio
     async def test_disabled_ignores_plan(self):
         coord = _make_coordinator(state=ChargingState.DISABLED)
         inv = _make_inverter()
@@ -150,9 +111,8 @@ class TestOnPlan:
 
         assert coord.charging_state == ChargingState.DISABLED
 
-    @pytest.mark.asyncio
     async def test_plan_stores_avg_price_in_session(self):
-        coord = _make_coordinator(state=ChargingState.IDLE)
+        coord = _make_coordinator()
         inv = _make_inverter()
         sm = ChargingStateMachine(coord, inv)
 
@@ -166,7 +126,6 @@ class TestOnPlan:
 class TestOnTick:
     """Test periodic tick handling."""
 
-    @pytest.mark.asyncio
     async def test_scheduled_in_window_starts_charging(self):
         coord = _make_coordinator(state=ChargingState.SCHEDULED, current_soc=30.0)
         inv = _make_inverter()
@@ -177,7 +136,7 @@ class TestOnTick:
         sm._session = _make_session()
 
         # Simulate time being 01:30
-        sm._now = lambda: datetime(2026, 2, 15, 1, 30)
+        sm._now = lambda: _T_0130
 
         await sm.async_on_tick()
 
@@ -186,24 +145,6 @@ class TestOnTick:
         inv.async_start_charging.assert_called_once_with(63.3)
         assert sm._session.start_soc == 30.0
 
-    @pytest.mark.asyncio
-    async def test_scheduled_not_in_window_stays(self):
-        coord = _make_coordinator(state=ChargingState.SCHEDULED, current_soc=30.0)
-        inv = _make_inverter()
-        sm = ChargingStateMachine(coord, inv)
-
-        schedule = _make_schedule(start_hour=1, end_hour=3)
-        coord.current_schedule = schedule
-
-        # Simulate time being 22:30 (not in 01-03 window)
-        sm._now = lambda: datetime(2026, 2, 15, 22, 30)
-
-        await sm.async_on_tick()
-
-        assert coord.charging_state == ChargingState.SCHEDULED
-        inv.async_start_charging.assert_not_called()
-
-    @pytest.mark.asyncio
     async def test_scheduled_already_at_target(self):
         coord = _make_coordinator(state=ChargingState.SCHEDULED, current_soc=85.0)
         inv = _make_inverter()
@@ -213,7 +154,7 @@ class TestOnTick:
         coord.current_schedule = schedule
         sm._session = _make_session()
 
-        sm._now = lambda: datetime(2026, 2, 15, 1, 30)
+        sm._now = lambda: _T_0130
 
         await sm.async_on_tick()
 
@@ -221,7 +162,6 @@ class TestOnTick:
         inv.async_start_charging.assert_not_called()
         assert sm._session.result == "Already at target"
 
-    @pytest.mark.asyncio
     async def test_charging_target_reached(self):
         coord = _make_coordinator(state=ChargingState.CHARGING, current_soc=82.0, min_soc=20.0)
         inv = _make_inverter()
@@ -231,7 +171,7 @@ class TestOnTick:
         coord.current_schedule = schedule
         sm._session = _make_session()
 
-        sm._now = lambda: datetime(2026, 2, 15, 2, 0)
+        sm._now = lambda: _T_0200
 
         await sm.async_on_tick()
 
@@ -240,7 +180,6 @@ class TestOnTick:
         assert sm._session.result == "Target reached"
         assert sm._session.end_soc == 82.0
 
-    @pytest.mark.asyncio
     async def test_charging_window_ended(self):
         coord = _make_coordinator(state=ChargingState.CHARGING, current_soc=60.0, min_soc=20.0)
         inv = _make_inverter()
@@ -259,24 +198,6 @@ class TestOnTick:
         inv.async_stop_charging.assert_called_once_with(20.0)
         assert sm._session.result == "Window ended"
 
-    @pytest.mark.asyncio
-    async def test_charging_continues_in_window(self):
-        coord = _make_coordinator(state=ChargingState.CHARGING, current_soc=60.0)
-        inv = _make_inverter()
-        sm = ChargingStateMachine(coord, inv)
-
-        schedule = _make_schedule(start_hour=1, end_hour=3, target_soc=80.0)
-        coord.current_schedule = schedule
-
-        sm._now = lambda: datetime(2026, 2, 15, 2, 0)
-
-        await sm.async_on_tick()
-
-        # Should stay CHARGING
-        assert coord.charging_state == ChargingState.CHARGING
-        inv.async_stop_charging.assert_not_called()
-
-    @pytest.mark.asyncio
     async def test_idle_tick_is_noop(self):
         coord = _make_coordinator(state=ChargingState.IDLE)
         inv = _make_inverter()
@@ -287,62 +208,63 @@ class TestOnTick:
         inv.async_start_charging.assert_not_called()
         inv.async_stop_charging.assert_not_called()
 
-    @pytest.mark.asyncio
-    async def test_midnight_crossing_window(self):
-        """Test window that crosses midnight (e.g., 22:00 - 02:00)."""
-        coord = _make_coordinator(state=ChargingState.SCHEDULED, current_soc=30.0)
+    @pytest.mark.parametrize(
+        ("state", "window", "now", "expected"),
+        [
+            (
+                ChargingState.SCHEDULED,
+                (1, 3),
+                datetime(2026, 2, 15, 22, 30),
+                ChargingState.SCHEDULED,
+            ),
+            (ChargingState.CHARGING, (1, 3), _T_0200, ChargingState.CHARGING),
+            # Window crossing midnight (22:00 - 02:00)
+            (
+                ChargingState.SCHEDULED,
+                (22, 2),
+                datetime(2026, 2, 15, 23, 30),
+                ChargingState.CHARGING,
+            ),
+            (
+                ChargingState.SCHEDULED,
+                (22, 2),
+                datetime(2026, 2, 15, 20, 0),
+                ChargingState.SCHEDULED,
+            ),
+            (ChargingState.CHARGING, (22, 2), datetime(2026, 2, 15, 3, 0), ChargingState.COMPLETE),
+        ],
+        ids=[
+            "scheduled_before_window",
+            "charging_in_window",
+            "midnight_crossing_in_window",
+            "midnight_crossing_before_window",
+            "midnight_crossing_after_window",
+        ],
+    )
+    async def test_window_membership(self, state, window, now, expected):
+        """Start, hold or stop depending on whether `now` is inside the window."""
+        coord = _make_coordinator(state=state, current_soc=50.0)
         inv = _make_inverter()
         sm = ChargingStateMachine(coord, inv)
 
-        schedule = _make_schedule(start_hour=22, end_hour=2, target_soc=80.0)
-        coord.current_schedule = schedule
+        coord.current_schedule = _make_schedule(
+            start_hour=window[0], end_hour=window[1], target_soc=80.0
+        )
         sm._session = _make_session()
-
-        # Time is 23:30 — should be in window
-        sm._now = lambda: datetime(2026, 2, 15, 23, 30)
+        sm._now = lambda: now
 
         await sm.async_on_tick()
-        assert coord.charging_state == ChargingState.CHARGING
 
-    @pytest.mark.asyncio
-    async def test_midnight_crossing_before_window(self):
-        """Before midnight-crossing window starts."""
-        coord = _make_coordinator(state=ChargingState.SCHEDULED, current_soc=30.0)
-        inv = _make_inverter()
-        sm = ChargingStateMachine(coord, inv)
-
-        schedule = _make_schedule(start_hour=22, end_hour=2, target_soc=80.0)
-        coord.current_schedule = schedule
-
-        # Time is 20:00 — before window
-        sm._now = lambda: datetime(2026, 2, 15, 20, 0)
-
-        await sm.async_on_tick()
-        assert coord.charging_state == ChargingState.SCHEDULED
-
-    @pytest.mark.asyncio
-    async def test_midnight_crossing_after_window(self):
-        """After midnight-crossing window ends."""
-        coord = _make_coordinator(state=ChargingState.CHARGING, current_soc=50.0, min_soc=20.0)
-        inv = _make_inverter()
-        sm = ChargingStateMachine(coord, inv)
-
-        schedule = _make_schedule(start_hour=22, end_hour=2, target_soc=80.0)
-        coord.current_schedule = schedule
-        sm._session = _make_session()
-
-        # Time is 03:00 — after window
-        sm._now = lambda: datetime(2026, 2, 15, 3, 0)
-
-        await sm.async_on_tick()
-        assert coord.charging_state == ChargingState.COMPLETE
-        inv.async_stop_charging.assert_called_once()
+        assert coord.charging_state == expected
+        assert inv.async_start_charging.called == (
+            state == ChargingState.SCHEDULED and expected == ChargingState.CHARGING
+        )
+        assert inv.async_stop_charging.called == (expected == ChargingState.COMPLETE)
 
 
 class TestMorningSafety:
     """Test morning safety handler."""
 
-    @pytest.mark.asyncio
     async def test_stops_active_charging(self):
         coord = _make_coordinator(state=ChargingState.CHARGING, current_soc=70.0, min_soc=20.0)
         inv = _make_inverter()
@@ -359,7 +281,6 @@ class TestMorningSafety:
         assert sm._session.end_soc == 70.0
         assert coord.current_schedule is None
 
-    @pytest.mark.asyncio
     async def test_restores_self_use_when_manual(self):
         coord = _make_coordinator(state=ChargingState.IDLE, min_soc=20.0)
         inv = _make_inverter()
@@ -372,7 +293,6 @@ class TestMorningSafety:
         inv.async_stop_charging.assert_called_once_with(20.0)
         assert coord.charging_state == ChargingState.IDLE
 
-    @pytest.mark.asyncio
     async def test_noop_when_self_use(self):
         coord = _make_coordinator(state=ChargingState.IDLE)
         inv = _make_inverter()
@@ -384,7 +304,6 @@ class TestMorningSafety:
 
         inv.async_stop_charging.assert_not_called()
 
-    @pytest.mark.asyncio
     async def test_clears_schedule(self):
         coord = _make_coordinator(state=ChargingState.SCHEDULED)
         coord.current_schedule = _make_schedule()
@@ -399,14 +318,13 @@ class TestMorningSafety:
 class TestDisableEnable:
     """Test disable/enable transitions."""
 
-    @pytest.mark.asyncio
     async def test_disable_while_charging_stops_inverter(self):
         coord = _make_coordinator(state=ChargingState.CHARGING, current_soc=65.0, min_soc=20.0)
         inv = _make_inverter()
         sm = ChargingStateMachine(coord, inv)
         sm._session = _make_session()
 
-        sm._now = lambda: datetime(2026, 2, 15, 2, 0)
+        sm._now = lambda: _T_0200
 
         await sm.async_on_disable()
 
@@ -415,7 +333,6 @@ class TestDisableEnable:
         assert sm._session.result == "Disabled"
         assert coord.current_schedule is None
 
-    @pytest.mark.asyncio
     async def test_disable_while_idle(self):
         coord = _make_coordinator(state=ChargingState.IDLE)
         inv = _make_inverter()
@@ -426,7 +343,6 @@ class TestDisableEnable:
         assert coord.charging_state == ChargingState.DISABLED
         inv.async_stop_charging.assert_not_called()
 
-    @pytest.mark.asyncio
     async def test_disable_while_scheduled(self):
         coord = _make_coordinator(state=ChargingState.SCHEDULED)
         coord.current_schedule = _make_schedule()
@@ -438,7 +354,6 @@ class TestDisableEnable:
         assert coord.charging_state == ChargingState.DISABLED
         assert coord.current_schedule is None
 
-    @pytest.mark.asyncio
     async def test_enable_from_disabled(self):
         coord = _make_coordinator(state=ChargingState.DISABLED)
         inv = _make_inverter()
@@ -448,7 +363,6 @@ class TestDisableEnable:
 
         assert coord.charging_state == ChargingState.IDLE
 
-    @pytest.mark.asyncio
     async def test_enable_when_not_disabled_is_noop(self):
         coord = _make_coordinator(state=ChargingState.IDLE)
         inv = _make_inverter()
@@ -463,7 +377,6 @@ class TestDisableEnable:
 class TestSessionPersistence:
     """Test that sessions are saved to storage."""
 
-    @pytest.mark.asyncio
     async def test_session_saved_on_target_reached(self):
         coord = _make_coordinator(state=ChargingState.CHARGING, current_soc=82.0, min_soc=20.0)
         inv = _make_inverter()
@@ -473,26 +386,24 @@ class TestSessionPersistence:
         coord.current_schedule = schedule
         sm._session = _make_session()
 
-        sm._now = lambda: datetime(2026, 2, 15, 2, 0)
+        sm._now = lambda: _T_0200
 
         await sm.async_on_tick()
 
         coord.store.async_set_last_session.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_session_saved_on_disable(self):
         coord = _make_coordinator(state=ChargingState.CHARGING, current_soc=60.0, min_soc=20.0)
         inv = _make_inverter()
         sm = ChargingStateMachine(coord, inv)
         sm._session = _make_session()
 
-        sm._now = lambda: datetime(2026, 2, 15, 2, 0)
+        sm._now = lambda: _T_0200
 
         await sm.async_on_disable()
 
         coord.store.async_set_last_session.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_session_saved_on_no_charging_needed(self):
         coord = _make_coordinator(state=ChargingState.IDLE)
         inv = _make_inverter()
@@ -508,7 +419,6 @@ class TestSessionPersistence:
 class TestStallDetection:
     """Test charging stall detection and retry."""
 
-    @pytest.mark.asyncio
     async def test_stall_retry_at_threshold(self):
         """After STALL_RETRY_TICKS without SOC change, retry charge command."""
         coord = _make_coordinator(state=ChargingState.CHARGING, current_soc=50.0, min_soc=20.0)
@@ -520,7 +430,7 @@ class TestStallDetection:
         sm._stall_start_soc = 50.0
         sm._stall_tick_count = STALL_RETRY_TICKS - 1  # one tick away from retry
 
-        sm._now = lambda: datetime(2026, 2, 15, 2, 0)
+        sm._now = lambda: _T_0200
 
         await sm.async_on_tick()
 
@@ -528,7 +438,6 @@ class TestStallDetection:
         inv.async_start_charging.assert_called_once_with(80.0)
         assert coord.charging_state == ChargingState.CHARGING  # still charging
 
-    @pytest.mark.asyncio
     async def test_stall_abort_at_threshold(self):
         """After STALL_ABORT_TICKS without SOC change, abort and notify."""
         coord = _make_coordinator(state=ChargingState.CHARGING, current_soc=50.0, min_soc=20.0)
@@ -543,7 +452,7 @@ class TestStallDetection:
         sm._stall_start_soc = 50.0
         sm._stall_tick_count = STALL_ABORT_TICKS - 1
 
-        sm._now = lambda: datetime(2026, 2, 15, 2, 0)
+        sm._now = lambda: _T_0200
 
         await sm.async_on_tick()
 
@@ -553,7 +462,33 @@ class TestStallDetection:
         assert sm._session.result == "Charging stalled"
         notifier.async_notify_charging_stalled.assert_called_once()
 
-    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "tick_count",
+        [
+            STALL_RETRY_TICKS - 2,
+            STALL_RETRY_TICKS,  # retry is sent once, not every tick
+            STALL_ABORT_TICKS - 2,
+        ],
+    )
+    async def test_stall_boundaries(self, tick_count):
+        """Ticks either side of the thresholds neither retry nor abort."""
+        coord = _make_coordinator(state=ChargingState.CHARGING, current_soc=50.0, min_soc=20.0)
+        inv = _make_inverter()
+        sm = ChargingStateMachine(coord, inv)
+
+        coord.current_schedule = _make_schedule(start_hour=1, end_hour=5, target_soc=80.0)
+        sm._session = _make_session()
+        sm._stall_start_soc = 50.0
+        sm._stall_tick_count = tick_count
+
+        sm._now = lambda: _T_0200
+
+        await sm.async_on_tick()
+
+        inv.async_start_charging.assert_not_called()
+        inv.async_stop_charging.assert_not_called()
+        assert coord.charging_state == ChargingState.CHARGING
+
     async def test_stall_resets_on_soc_change(self):
         """SOC change resets stall counters."""
         coord = _make_coordinator(state=ChargingState.CHARGING, current_soc=55.0, min_soc=20.0)
@@ -565,7 +500,7 @@ class TestStallDetection:
         sm._stall_start_soc = 50.0  # was 50, now 55 → SOC changed
         sm._stall_tick_count = 10
 
-        sm._now = lambda: datetime(2026, 2, 15, 2, 0)
+        sm._now = lambda: _T_0200
 
         await sm.async_on_tick()
 
@@ -574,7 +509,6 @@ class TestStallDetection:
         assert sm._stall_tick_count == 0
         assert coord.charging_state == ChargingState.CHARGING
 
-    @pytest.mark.asyncio
     async def test_stall_counters_reset_on_charge_start(self):
         """Stall counters are reset when entering CHARGING state."""
         coord = _make_coordinator(state=ChargingState.SCHEDULED, current_soc=30.0)
@@ -585,7 +519,7 @@ class TestStallDetection:
         coord.current_schedule = schedule
         sm._session = _make_session()
 
-        sm._now = lambda: datetime(2026, 2, 15, 1, 30)
+        sm._now = lambda: _T_0130
 
         await sm.async_on_tick()
 
@@ -597,7 +531,6 @@ class TestStallDetection:
 class TestStartFailureRetry:
     """Test C3: don't transition to CHARGING when start fails."""
 
-    @pytest.mark.asyncio
     async def test_start_failure_stays_scheduled(self):
         """When inverter returns False, stay in SCHEDULED."""
         coord = _make_coordinator(state=ChargingState.SCHEDULED, current_soc=30.0)
@@ -609,14 +542,13 @@ class TestStartFailureRetry:
         coord.current_schedule = schedule
         sm._session = _make_session()
 
-        sm._now = lambda: datetime(2026, 2, 15, 1, 30)
+        sm._now = lambda: _T_0130
 
         await sm.async_on_tick()
 
         assert coord.charging_state == ChargingState.SCHEDULED
         assert sm._start_fail_count == 1
 
-    @pytest.mark.asyncio
     async def test_start_failure_aborts_after_max_retries(self):
         """After START_FAILURE_MAX_RETRIES failures, abort to IDLE."""
         coord = _make_coordinator(state=ChargingState.SCHEDULED, current_soc=30.0)
@@ -631,7 +563,7 @@ class TestStartFailureRetry:
         sm._session = _make_session()
         sm._start_fail_count = START_FAILURE_MAX_RETRIES - 1
 
-        sm._now = lambda: datetime(2026, 2, 15, 1, 30)
+        sm._now = lambda: _T_0130
 
         await sm.async_on_tick()
 
@@ -640,7 +572,23 @@ class TestStartFailureRetry:
         coord.store.async_set_last_session.assert_called_once()
         notifier.async_notify_charging_stalled.assert_called_once()
 
-    @pytest.mark.asyncio
+    async def test_start_failure_before_max_retries_stays_scheduled(self):
+        """The failure before START_FAILURE_MAX_RETRIES still retries."""
+        coord = _make_coordinator(state=ChargingState.SCHEDULED, current_soc=30.0)
+        inv = _make_inverter()
+        inv.async_start_charging = AsyncMock(return_value=False)
+        sm = ChargingStateMachine(coord, inv)
+
+        coord.current_schedule = _make_schedule(start_hour=1, end_hour=3, target_soc=80.0)
+        sm._session = _make_session()
+        sm._start_fail_count = START_FAILURE_MAX_RETRIES - 2
+
+        sm._now = lambda: _T_0130
+
+        await sm.async_on_tick()
+
+        assert coord.charging_state == ChargingState.SCHEDULED
+
     async def test_start_failure_counter_resets_on_success(self):
         """Successful start after failures resets the counter."""
         coord = _make_coordinator(state=ChargingState.SCHEDULED, current_soc=30.0)
@@ -652,7 +600,7 @@ class TestStartFailureRetry:
         sm._session = _make_session()
         sm._start_fail_count = 2
 
-        sm._now = lambda: datetime(2026, 2, 15, 1, 30)
+        sm._now = lambda: _T_0130
 
         await sm.async_on_tick()
 
@@ -663,7 +611,6 @@ class TestStartFailureRetry:
 class TestStatePersistence:
     """Test that state and schedule are persisted to store (C1)."""
 
-    @pytest.mark.asyncio
     async def test_state_persisted_on_transition(self):
         """State transitions call store.async_set_charging_state."""
         coord = _make_coordinator(state=ChargingState.IDLE)
@@ -675,7 +622,6 @@ class TestStatePersistence:
 
         coord.store.async_set_charging_state.assert_called_with("scheduled")
 
-    @pytest.mark.asyncio
     async def test_schedule_persisted_on_plan(self):
         """Schedule is persisted when a plan is set."""
         coord = _make_coordinator(state=ChargingState.IDLE)
@@ -691,7 +637,6 @@ class TestStatePersistence:
         assert saved["end_hour"] == 3
         assert saved["target_soc"] == 80.0
 
-    @pytest.mark.asyncio
     async def test_schedule_cleared_on_morning_safety(self):
         """Morning safety clears the persisted schedule."""
         coord = _make_coordinator(state=ChargingState.IDLE)
@@ -703,7 +648,6 @@ class TestStatePersistence:
 
         coord.store.async_set_current_schedule.assert_called_with(None)
 
-    @pytest.mark.asyncio
     async def test_charge_history_appended_on_session_save(self):
         """M1: charge_history is appended when session has kWh > 0."""
         coord = _make_coordinator(state=ChargingState.CHARGING, current_soc=80.0, min_soc=20.0)
@@ -715,7 +659,7 @@ class TestStatePersistence:
         sm._session = _make_session()
         sm._session.kwh_charged.return_value = 5.0
 
-        sm._now = lambda: datetime(2026, 2, 15, 2, 0)
+        sm._now = lambda: _T_0200
 
         await sm.async_on_tick()
 
@@ -725,7 +669,6 @@ class TestStatePersistence:
 class TestTargetSocAdjustment:
     """Tests for target SOC recalculation at charge start."""
 
-    @pytest.mark.asyncio
     async def test_target_adjusted_when_soc_lower_than_projected(self):
         """When actual SOC is lower than projected, target is lowered."""
         coord = _make_coordinator(state=ChargingState.SCHEDULED, current_soc=20.0)
@@ -751,7 +694,6 @@ class TestTargetSocAdjustment:
         saved = coord.store.async_set_current_schedule.call_args[0][0]
         assert saved["target_soc"] == 42.7
 
-    @pytest.mark.asyncio
     async def test_target_not_adjusted_when_close_to_planned(self):
         """When actual SOC is close to projected, target stays."""
         coord = _make_coordinator(state=ChargingState.SCHEDULED, current_soc=44.0)
@@ -774,7 +716,6 @@ class TestTargetSocAdjustment:
         # Target NOT adjusted (within 1% tolerance)
         inv.async_start_charging.assert_called_once_with(77.0)
 
-    @pytest.mark.asyncio
     async def test_target_clamped_to_max_charge_level(self):
         """Adjusted target doesn't exceed max_charge_level."""
         coord = _make_coordinator(state=ChargingState.SCHEDULED, current_soc=70.0)
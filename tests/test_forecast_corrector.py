@@ -118,3 +118,17 @@ class TestAdjustForecast:
         adjusted = forecast_corrector.adjust_forecast(5.0, history)
         # 5 * (1 - 1.5) = -2.5 → clamped to 0
         assert adjusted == 0.0
+
+    def test_apply_error_matches_adjust(self, forecast_corrector: ForecastCorrector):
+        history = [0.4, -0.1, 0.3]
+        avg = forecast_corrector.average_error(history)
+        assert forecast_corrector.apply_error(10.0, avg) == forecast_corrector.adjust_forecast(
+            10.0, history
+        )
+
+    def test_stats_returns_ratio_and_pct(self, forecast_corrector: ForecastCorrector):
+        history = [0.4, 0.2]
+        assert forecast_corrector.stats(history) == (
+            forecast_corrector.average_error(history),
+            forecast_corrector.average_error_pct(history),
+        )
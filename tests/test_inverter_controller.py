@@ -3,39 +3,10 @@
 from __future__ import annotations
 
 import asyncio
-import sys
-from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-# Mock HA modules before importing the package
-for mod_name in [
-    "homeassistant",
-    "homeassistant.core",
-    "homeassistant.config_entries",
-    "homeassistant.helpers",
-    "homeassistant.helpers.update_coordinator",
-    "homeassistant.helpers.storage",
-    "homeassistant.helpers.entity_platform",
-    "homeassistant.helpers.selector",
-    "homeassistant.helpers.event",
-    "homeassistant.components",
-    "homeassistant.components.switch",
-    "homeassistant.components.sensor",
-    "homeassistant.components.binary_sensor",
-    "homeassistant.components.number",
-    "homeassistant.data_entry_flow",
-    "homeassistant.util",
-    "homeassistant.util.dt",
-    "voluptuous",
-]:
-    sys.modules.setdefault(mod_name, MagicMock())
-
-# Import as package so relative imports work
-_COMPONENTS_DIR = Path(__file__).parent.parent / "custom_components"
-sys.path.insert(0, str(_COMPONENTS_DIR))
-
 from smart_energy_manager.inverters import (
     InverterCommandError,
     MODBUS_SETTLE_DELAY,
@@ -122,7 +93,6 @@ class TestConfigAccessors:
 class TestStartCharging:
     """Test the start-charging sequence."""
 
-    @pytest.mark.asyncio
     async def test_start_charging_sequence(self, controller, hass):
         """Verify correct order: SOC limit → Manual Mode → delay → Force Charge."""
         with patch(
@@ -146,7 +116,6 @@ class TestStartCharging:
         args, kwargs = calls[2]
         assert args == ("select", "select_option", {"entity_id": "select.solax_charger_use_mode", "option": "Force Charge"})
 
-    @pytest.mark.asyncio
     async def test_start_charging_has_delay(self, controller, hass):
         """Verify 5s delay between mode switch and charge command."""
         with patch(
@@ -160,7 +129,6 @@ class TestStartCharging:
 class TestStopCharging:
     """Test the stop-charging sequence."""
 
-    @pytest.mark.asyncio
     async def test_stop_charging_sequence(self, controller, hass):
         """Verify correct order: Stop → delay → Reset SOC → Self Use → discharge min."""
         with patch(
@@ -188,7 +156,6 @@ class TestStopCharging:
         args, kwargs = calls[3]
         assert args == ("number", "set_value", {"entity_id": "number.solax_discharge_min_soc", "value": 20.0})
 
-    @pytest.mark.asyncio
     async def test_stop_charging_no_discharge_entity(self, hass):
         """When no discharge min SOC entity configured, skip that step."""
         config_no_discharge = {
@@ -210,7 +177,6 @@ class TestStopCharging:
         # Should be 3 calls (no discharge min SOC)
         assert hass.services.async_call.call_count == 3
 
-    @pytest.mark.asyncio
     async def test_stop_charging_has_delay(self, controller, hass):
         """Verify 5s delay between stop command and mode restore."""
         with patch(
@@ -224,7 +190,6 @@ class TestStopCharging:
 class TestGetCurrentMode:
     """Test reading current inverter mode."""
 
-    @pytest.mark.asyncio
     async def test_returns_state(self, controller, hass):
         state_obj = MagicMock()
         state_obj.state = "Self Use Mode"
@@ -233,7 +198,6 @@ class TestGetCurrentMode:
         mode = await controller.async_get_current_mode()
         assert mode == "Self Use Mode"
 
-    @pytest.mark.asyncio
     async def test_returns_empty_when_unavailable(self, controller, hass):
         state_obj = MagicMock()
         state_obj.state = "unavailable"
@@ -242,7 +206,6 @@ class TestGetCurrentMode:
         mode = await controller.async_get_current_mode()
         assert mode == ""
 
-    @pytest.mark.asyncio
     async def test_returns_empty_when_no_state(self, controller, hass):
         hass.states.get.return_value = None
 
@@ -272,7 +235,6 @@ class TestIsManualMode:
 class TestCommandVerification:
     """Test that commands verify the result (Fix 4)."""
 
-    @pytest.mark.asyncio
     async def test_start_charging_returns_true_on_success(self, controller, hass):
         """Returns True when mode confirms manual."""
         state_obj = MagicMock()
@@ -287,7 +249,6 @@ class TestCommandVerification:
 
         assert result is True
 
-    @pytest.mark.asyncio
     async def test_start_charging_returns_false_on_failure(self, controller, hass):
         """Returns False when mode is not manual after command."""
         state_obj = MagicMock()
@@ -302,7 +263,6 @@ class TestCommandVerification:
 
         assert result is False
 
-    @pytest.mark.asyncio
     async def test_stop_charging_returns_true_on_success(self, controller, hass):
         """Returns True when mode confirms self-use after stop."""
         state_obj = MagicMock()
@@ -317,7 +277,6 @@ class TestCommandVerification:
 
         assert result is True
 
-    @pytest.mark.asyncio
     async def test_stop_charging_returns_false_if_still_manual(self, controller, hass):
         """Returns False when still in manual mode after stop command."""
         state_obj = MagicMock()
@@ -336,7 +295,6 @@ class TestCommandVerification:
 class TestModbusTimeout:
     """Test Modbus call timeout handling (C2)."""
 
-    @pytest.mark.asyncio
     async def test_timeout_on_service_call_returns_false(self, controller, hass):
         """Service call timeout → InverterCommandError → returns False."""
         hass.services.async_call = AsyncMock(side_effect=asyncio.TimeoutError)
@@ -349,7 +307,6 @@ class TestModbusTimeout:
 
         assert result is False
 
-    @pytest.mark.asyncio
     async def test_timeout_on_stop_returns_false(self, controller, hass):
         """Stop charging timeout → returns False."""
         hass.services.async_call = AsyncMock(side_effect=asyncio.TimeoutError)
@@ -366,7 +323,6 @@ class TestModbusTimeout:
 class TestEMSControl:
     """Test EMS power-based control (Wattsonic)."""
 
-    @pytest.mark.asyncio
     async def test_ems_start_charging(self, ems_controller, hass):
         """EMS start: set working mode, battery power, AC limit."""
         # Mock state to confirm mode set
@@ -397,7 +353,6 @@ class TestEMSControl:
         args, _ = calls[2]
         assert args == ("number", "set_value", {"entity_id": "number.wattsonic_ac_lower_limit", "value": -5000.0})
 
-    @pytest.mark.asyncio
     async def test_ems_stop_charging(self, ems_controller, hass):
         """EMS stop: set power=0, restore general mode, set DOD."""
         # Mock state to confirm mode restored
@@ -428,7 +383,6 @@ class TestEMSControl:
         args, _ = calls[2]
         assert args == ("number", "set_value", {"entity_id": "number.wattsonic_battery_dod", "value": 80.0})
 
-    @pytest.mark.asyncio
     async def test_ems_get_current_mode(self, ems_controller, hass):
         """EMS get_current_mode reads number state as int string."""
         state_obj = MagicMock()
@@ -438,7 +392,6 @@ class TestEMSControl:
         mode = await ems_controller.async_get_current_mode()
         assert mode == "771"
 
-    @pytest.mark.asyncio
     async def test_ems_start_returns_false_on_wrong_mode(self, ems_controller, hass):
         """EMS start returns False when mode doesn't confirm."""
         state_obj = MagicMock()
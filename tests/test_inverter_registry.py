@@ -2,38 +2,10 @@
 
 from __future__ import annotations
 
-import sys
-from pathlib import Path
 from unittest.mock import MagicMock
 
 import pytest
 
-# Mock HA modules before importing the package
-for mod_name in [
-    "homeassistant",
-    "homeassistant.core",
-    "homeassistant.config_entries",
-    "homeassistant.helpers",
-    "homeassistant.helpers.update_coordinator",
-    "homeassistant.helpers.storage",
-    "homeassistant.helpers.entity_platform",
-    "homeassistant.helpers.selector",
-    "homeassistant.helpers.event",
-    "homeassistant.components",
-    "homeassistant.components.switch",
-    "homeassistant.components.sensor",
-    "homeassistant.components.binary_sensor",
-    "homeassistant.components.number",
-    "homeassistant.data_entry_flow",
-    "homeassistant.util",
-    "homeassistant.util.dt",
-    "voluptuous",
-]:
-    sys.modules.setdefault(mod_name, MagicMock())
-
-_COMPONENTS_DIR = Path(__file__).parent.parent / "custom_components"
-sys.path.insert(0, str(_COMPONENTS_DIR))
-
 from smart_energy_manager.inverters import (
     INVERTER_TEMPLATES,
     BaseInverterController,
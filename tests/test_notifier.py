@@ -2,41 +2,13 @@
 
 from __future__ import annotations
 
-import sys
 from datetime import date, datetime
-from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-# Mock HA modules before importing
 _DAYTIME = datetime(2026, 2, 26, 15, 0, 0)  # 15:00 — daytime for tests
 
-for mod_name in [
-    "homeassistant",
-    "homeassistant.core",
-    "homeassistant.config_entries",
-    "homeassistant.helpers",
-    "homeassistant.helpers.update_coordinator",
-    "homeassistant.helpers.storage",
-    "homeassistant.helpers.entity_platform",
-    "homeassistant.helpers.selector",
-    "homeassistant.helpers.event",
-    "homeassistant.components",
-    "homeassistant.components.switch",
-    "homeassistant.components.sensor",
-    "homeassistant.components.binary_sensor",
-    "homeassistant.components.number",
-    "homeassistant.data_entry_flow",
-    "homeassistant.util",
-    "homeassistant.util.dt",
-    "voluptuous",
-]:
-    sys.modules.setdefault(mod_name, MagicMock())
-
-_COMPONENTS_DIR = Path(__file__).parent.parent / "custom_components"
-sys.path.insert(0, str(_COMPONENTS_DIR))
-
 from smart_energy_manager.models import (
     ChargingSchedule,
     ChargingSession,
@@ -139,7 +111,6 @@ def _make_hass():
 class TestPlanNotification:
     """Test planning notification variants."""
 
-    @pytest.mark.asyncio
     async def test_plan_scheduled_sends_notification(self):
         hass = _make_hass()
         coord = _make_coordinator()
@@ -161,7 +132,6 @@ class TestPlanNotification:
         assert "5.0 kWh" in data["message"]
         assert "80%" in data["message"]
 
-    @pytest.mark.asyncio
     async def test_plan_not_needed_sends_solar_message(self):
         hass = _make_hass()
         coord = _make_coordinator()
@@ -176,7 +146,6 @@ class TestPlanNotification:
         assert "No Charging Needed" in data["title"]
         assert "Battery charge + solar cover" in data["message"]
 
-    @pytest.mark.asyncio
     async def test_plan_not_scheduled_price_too_high(self):
         hass = _make_hass()
         coord = _make_coordinator()
@@ -192,7 +161,6 @@ class TestPlanNotification:
         assert "5.0 kWh" in data["message"]
         assert "Price threshold" in data["message"]
 
-    @pytest.mark.asyncio
     async def test_plan_includes_solar_and_consumption(self):
         hass = _make_hass()
         coord = _make_coordinator()
@@ -214,7 +182,6 @@ class TestPlanNotification:
 class TestChargingStartedNotification:
     """Test charging started notification."""
 
-    @pytest.mark.asyncio
     async def test_sends_notification(self):
         hass = _make_hass()
         coord = _make_coordinator()
@@ -233,7 +200,6 @@ class TestChargingStartedNotification:
 class TestChargingCompleteNotification:
     """Test charging complete notification."""
 
-    @pytest.mark.asyncio
     async def test_target_reached(self):
         hass = _make_hass()
         coord = _make_coordinator()
@@ -250,7 +216,6 @@ class TestChargingCompleteNotification:
         assert "30%" in data["message"]  # start_soc
         assert "80%" in data["message"]  # end_soc / target
 
-    @pytest.mark.asyncio
     async def test_window_ended(self):
         hass = _make_hass()
         coord = _make_coordinator()
@@ -264,7 +229,6 @@ class TestChargingCompleteNotification:
         assert "Window ended" in data["message"]
         assert "65%" in data["message"]
 
-    @pytest.mark.asyncio
     async def test_includes_duration(self):
         hass = _make_hass()
         coord = _make_coordinator()
@@ -282,7 +246,6 @@ class TestChargingCompleteNotification:
 class TestMorningSafetyNotification:
     """Test morning safety notification."""
 
-    @pytest.mark.asyncio
     async def test_sends_notification(self):
         hass = _make_hass()
         coord = _make_coordinator()
@@ -300,7 +263,6 @@ class TestMorningSafetyNotification:
 class TestServiceNotConfigured:
     """Test that no calls are made when service is not configured."""
 
-    @pytest.mark.asyncio
     async def test_empty_service_no_call(self):
         hass = _make_hass()
         coord = _make_coordinator(notification_service="")
@@ -317,7 +279,6 @@ class TestServiceNotConfigured:
 class TestToggles:
     """Test that individual toggles disable their notification type."""
 
-    @pytest.mark.asyncio
     async def test_planning_toggle_off(self):
         hass = _make_hass()
         coord = _make_coordinator(notify_planning=False)
@@ -326,7 +287,6 @@ class TestToggles:
         await notifier.async_notify_plan(_make_schedule(), _make_deficit())
         hass.services.async_call.assert_not_called()
 
-    @pytest.mark.asyncio
     async def test_charging_start_toggle_off(self):
         hass = _make_hass()
         coord = _make_coordinator(notify_charging_start=False)
@@ -335,7 +295,6 @@ class TestToggles:
         await notifier.async_notify_charging_started(30.0, 80.0, 5.0)
         hass.services.async_call.assert_not_called()
 
-    @pytest.mark.asyncio
     async def test_charging_complete_toggle_off(self):
         hass = _make_hass()
         coord = _make_coordinator(notify_charging_complete=False)
@@ -344,7 +303,6 @@ class TestToggles:
         await notifier.async_notify_charging_complete(_make_session(), 80.0)
         hass.services.async_call.assert_not_called()
 
-    @pytest.mark.asyncio
     async def test_morning_safety_toggle_off(self):
         hass = _make_hass()
         coord = _make_coordinator(notify_morning_safety=False)
@@ -357,7 +315,6 @@ class TestToggles:
 class TestDeduplication:
     """Test planning notification deduplication."""
 
-    @pytest.mark.asyncio
     async def test_same_schedule_twice_only_one_call(self):
         hass = _make_hass()
         coord = _make_coordinator()
@@ -371,7 +328,6 @@ class TestDeduplication:
 
         assert hass.services.async_call.call_count == 1
 
-    @pytest.mark.asyncio
     async def test_different_schedule_sends_again(self):
         hass = _make_hass()
         coord = _make_coordinator()
@@ -387,7 +343,6 @@ class TestDeduplication:
 
         assert hass.services.async_call.call_count == 2
 
-    @pytest.mark.asyncio
     async def test_new_day_resets_dedup(self):
         hass = _make_hass()
         coord = _make_coordinator()
@@ -405,7 +360,6 @@ class TestDeduplication:
 
         assert hass.services.async_call.call_count == 2
 
-    @pytest.mark.asyncio
     async def test_no_schedule_dedup_works(self):
         """Same no-schedule deficit twice → only one notification."""
         hass = _make_hass()
@@ -423,7 +377,6 @@ class TestDeduplication:
 class TestOvernightSuppression:
     """Test that plan notifications are suppressed during overnight hours."""
 
-    @pytest.mark.asyncio
     async def test_suppressed_at_2am(self, _patch_dt_util_now):
         hass = _make_hass()
         coord = _make_coordinator()
@@ -433,7 +386,6 @@ class TestOvernightSuppression:
             await n.async_notify_plan(_make_schedule(), _make_deficit())
         hass.services.async_call.assert_not_called()
 
-    @pytest.mark.asyncio
     async def test_suppressed_at_23pm(self, _patch_dt_util_now):
         hass = _make_hass()
         coord = _make_coordinator()
@@ -443,7 +395,6 @@ class TestOvernightSuppression:
             await n.async_notify_plan(_make_schedule(), _make_deficit())
         hass.services.async_call.assert_not_called()
 
-    @pytest.mark.asyncio
     async def test_not_suppressed_at_15pm(self):
         hass = _make_hass()
         coord = _make_coordinator()
@@ -456,7 +407,6 @@ class TestOvernightSuppression:
 class TestServiceError:
     """Test that service call errors are handled gracefully."""
 
-    @pytest.mark.asyncio
     async def test_exception_does_not_propagate(self):
         hass = _make_hass()
         hass.services.async_call = AsyncMock(side_effect=Exception("Service unavailable"))
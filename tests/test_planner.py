@@ -2,43 +2,15 @@
 
 from __future__ import annotations
 
-import sys
 from datetime import datetime, timedelta
-from pathlib import Path
 from unittest.mock import MagicMock, PropertyMock
 
 import pytest
-
-# Mock HA modules before importing
-for mod_name in [
-    "homeassistant",
-    "homeassistant.core",
-    "homeassistant.config_entries",
-    "homeassistant.helpers",
-    "homeassistant.helpers.update_coordinator",
-    "homeassistant.helpers.storage",
-    "homeassistant.helpers.entity_platform",
-    "homeassistant.helpers.selector",
-    "homeassistant.helpers.event",
-    "homeassistant.components",
-    "homeassistant.components.switch",
-    "homeassistant.components.sensor",
-    "homeassistant.components.binary_sensor",
-    "homeassistant.components.number",
-    "homeassistant.data_entry_flow",
-    "homeassistant.util",
-    "homeassistant.util.dt",
-    "voluptuous",
-]:
-    sys.modules.setdefault(mod_name, MagicMock())
-
-_COMPONENTS_DIR = Path(__file__).parent.parent / "custom_components"
-sys.path.insert(0, str(_COMPONENTS_DIR))
-
 from smart_energy_manager.consumption_tracker import ConsumptionTracker
+from smart_energy_manager.coordinator import _dense_hourly
 from smart_energy_manager.forecast_corrector import ForecastCorrector
 from smart_energy_manager.models import EnergyDeficit, OvernightNeed, SurplusForecast
-from smart_energy_manager.planner import ChargingPlanner
+from smart_energy_manager.planner import ChargingPlanner, _simulate_hours
 from smart_energy_manager.price_analyzer import PriceAnalyzer, PriceSlot, PriceWindow
 
 # Fixed test time: Wednesday 2026-02-25 20:00 (Thursday tomorrow — not weekend)
@@ -88,11 +60,11 @@ def _make_coordinator(
     coord.weekend_consumption_multiplier = weekend_consumption_multiplier
 
     # Hourly solar properties
-    type(coord).solar_forecast_tomorrow_hourly = PropertyMock(
-        return_value=solar_forecast_tomorrow_hourly or {}
+    type(coord).solar_forecast_tomorrow_hourly_list = PropertyMock(
+        return_value=_dense_hourly(solar_forecast_tomorrow_hourly)
     )
-    type(coord).solar_forecast_today_hourly = PropertyMock(
-        return_value=solar_forecast_today_hourly or {}
+    type(coord).solar_forecast_today_hourly_list = PropertyMock(
+        return_value=_dense_hourly(solar_forecast_today_hourly)
     )
     type(coord).sunrise_hour_tomorrow = PropertyMock(return_value=sunrise_hour_tomorrow)
 
@@ -105,8 +77,12 @@ def _make_coordinator(
     coord.store = MagicMock()
     coord.store.consumption_history = [16.0, 17.0, 16.5] if consumption_history is None else consumption_history
     coord.store.forecast_error_history = [] if forecast_error_history is None else forecast_error_history
+    coord.forecast_error_stats = coord.forecast_corrector.stats(
+        coord.store.forecast_error_history
+    )
 
-    # Price attributes — default: realistic night prices using fixed test dates
+    # Price sensor attributes, parsed into the index the planner reads —
+    # default: realistic night prices using fixed test dates
     if price_attributes is None:
         price_attributes = {
             f"{_TEST_TODAY}T22:00:00+01:00": 1.8,
@@ -118,7 +94,7 @@ def _make_coordinator(
             f"{_TEST_TOMORROW}T04:00:00+01:00": 2.0,
             f"{_TEST_TOMORROW}T05:00:00+01:00": 2.5,
         }
-    coord.price_attributes = price_attributes
+    coord.price_index = coord.price_analyzer.index_prices(price_attributes)
 
     return coord
 
@@ -134,10 +110,10 @@ class TestComputeEnergyDeficit:
         planner = ChargingPlanner(coord)
         deficit = planner.compute_energy_deficit(now=_TEST_NOW)
 
-        assert deficit.consumption == 16.5  # average of 16, 17, 16.5
+        assert deficit.consumption == pytest.approx(16.5)  # average of 16, 17, 16.5
         assert deficit.solar_raw == 5.0
         assert deficit.solar_adjusted == 5.0  # no error history
-        assert deficit.deficit == 11.5  # 16.5 - 5.0
+        assert deficit.deficit == pytest.approx(11.5)  # 16.5 - 5.0
         assert deficit.usable_capacity == 10.5  # 15 * (90-20)/100
         # charge_needed is trajectory-based (accounts for current SOC)
         assert deficit.charge_needed > 0
@@ -180,7 +156,7 @@ class TestComputeEnergyDeficit:
 
         assert deficit.solar_raw == 10.0
         assert deficit.solar_adjusted == 6.0
-        assert deficit.deficit == 10.0  # 16.0 - 6.0
+        assert deficit.deficit == pytest.approx(10.0)  # 16.0 - 6.0
         assert deficit.forecast_error_pct == 40.0
 
     def test_uses_fallback_consumption_when_no_history(self):
@@ -191,7 +167,7 @@ class TestComputeEnergyDeficit:
         planner = ChargingPlanner(coord)
         deficit = planner.compute_energy_deficit(now=_TEST_NOW)
 
-        assert deficit.consumption == 20.0  # fallback
+        assert deficit.consumption == pytest.approx(20.0)  # fallback
 
 
 class TestHasTomorrowPrices:
@@ -214,6 +190,13 @@ class TestHasTomorrowPrices:
         planner = ChargingPlanner(coord)
         assert planner.has_tomorrow_prices(now=_TEST_NOW) is False
 
+    def test_preformatted_date(self):
+        coord = _make_coordinator()
+        planner = ChargingPlanner(coord)
+        tomorrow_str = (_TEST_NOW + timedelta(days=1)).strftime("%Y-%m-%d")
+        assert planner.has_tomorrow_prices(tomorrow_str=tomorrow_str) is True
+        assert planner.has_tomorrow_prices(tomorrow_str="2020-01-01") is False
+
 
 class TestComputeTargetSoc:
     """Test target SOC calculation."""
@@ -492,6 +475,33 @@ class TestComputeOvernightNeed:
         # Battery at window start should be less than current usable
         assert overnight.battery_at_window_start < 6.0
 
+    def test_snapshot_matches_separate_calls(self):
+        """The snapshot carries the same views as the two wrappers."""
+        coord = _make_coordinator(current_soc=30.0)
+        planner = ChargingPlanner(coord)
+        snapshot = planner.planning_snapshot(now=_TEST_NOW)
+
+        assert snapshot.deficit == planner.compute_energy_deficit(now=_TEST_NOW)
+        assert snapshot.overnight == planner.compute_overnight_need(now=_TEST_NOW)
+
+    def test_trajectory_deficit_view(self):
+        coord = _make_coordinator(current_soc=30.0)
+        trajectory = ChargingPlanner(coord).simulate_trajectory(now=_TEST_NOW)
+
+        deficit = trajectory.to_energy_deficit()
+        assert deficit.charge_needed == trajectory.charge_needed_kwh
+        assert deficit.deficit == trajectory.daily_deficit_kwh
+        assert deficit.usable_capacity == trajectory.usable_capacity_kwh
+
+    def test_snapshot_reused_while_inputs_unchanged(self):
+        coord = _make_coordinator(current_soc=30.0)
+        planner = ChargingPlanner(coord)
+        first = planner.planning_snapshot(now=_TEST_NOW)
+        assert planner.planning_snapshot(now=_TEST_NOW) is first
+
+        coord.current_soc = 80.0
+        assert planner.planning_snapshot(now=_TEST_NOW) is not first
+
 
 class TestChargingEfficiency:
     """Test that charging efficiency increases required kWh."""
@@ -549,9 +559,10 @@ class TestConsumptionProfiles:
         )
         planner = ChargingPlanner(coord)
         # daily=24 → base_rate = 24 / (12*1.0 + 5*1.5 + 7*0.5) = 24 / 23 ≈ 1.043
-        hourly_day = planner._hourly_consumption(12, 24.0)
-        hourly_evening = planner._hourly_consumption(20, 24.0)
-        hourly_night = planner._hourly_consumption(2, 24.0)
+        weights = planner._hourly_weights()
+        hourly_day = 24.0 * weights[12]
+        hourly_evening = 24.0 * weights[20]
+        hourly_night = 24.0 * weights[2]
 
         assert hourly_evening > hourly_day  # evening > day
         assert hourly_day > hourly_night   # day > night
@@ -568,7 +579,7 @@ class TestConsumptionProfiles:
         )
         planner = ChargingPlanner(coord)
         daily = 16.5
-        total = sum(planner._hourly_consumption(h, daily) for h in range(24))
+        total = sum(daily * w for w in planner._hourly_weights())
         assert abs(total - daily) < 0.01
 
     def test_flat_profile_equals_simple_division(self):
@@ -579,8 +590,22 @@ class TestConsumptionProfiles:
         )
         planner = ChargingPlanner(coord)
         daily = 24.0
-        for h in range(24):
-            assert abs(planner._hourly_consumption(h, daily) - 1.0) < 0.001
+        for w in planner._hourly_weights():
+            assert abs(daily * w - 1.0) < 0.001
+
+    def test_weights_rebuilt_when_multipliers_change(self):
+        """The cached weight table follows multiplier changes."""
+        coord = _make_coordinator(
+            evening_consumption_multiplier=1.0,
+            night_consumption_multiplier=1.0,
+        )
+        planner = ChargingPlanner(coord)
+        assert planner._hourly_weights()[20] == pytest.approx(1 / 24)
+
+        coord.evening_consumption_multiplier = 2.0
+        weights = planner._hourly_weights()
+        assert weights[20] == pytest.approx(2.0 / 29)
+        assert sum(weights) == pytest.approx(1.0)
 
 
 class TestNegativePriceExploitation:
@@ -1036,6 +1061,45 @@ class TestSimulateTrajectory:
         # With trajectory, we get the exact minimum needed
         assert t.charge_needed_kwh < 10.5  # less than full usable capacity
 
+    def test_context_reused_from_caller(self):
+        """A prebuilt plan context is used instead of re-reading the coordinator."""
+        coord = _make_coordinator(consumption_history=[16.0])
+        planner = ChargingPlanner(coord)
+        ctx = planner._build_context(_TEST_NOW)
+
+        # Changing the coordinator after the context is built has no effect
+        coord.store.consumption_history = [40.0]
+        t = planner.simulate_trajectory(now=_TEST_NOW, ctx=ctx)
+
+        assert ctx.daily_consumption == 16.0
+        assert ctx.usable_capacity == pytest.approx(10.5)
+        assert t.tomorrow_consumption == pytest.approx(16.0)
+
+    def test_result_reused_when_inputs_unchanged(self):
+        """Repeated simulation with identical inputs returns the cached result."""
+        coord = _make_coordinator(current_soc=40.0)
+        planner = ChargingPlanner(coord)
+        first = planner.simulate_trajectory(now=_TEST_NOW)
+
+        assert planner.simulate_trajectory(now=_TEST_NOW) is first
+
+        coord.current_soc = 60.0
+        changed = planner.simulate_trajectory(now=_TEST_NOW)
+        assert changed is not first
+        assert changed.battery_at_window_start_kwh > first.battery_at_window_start_kwh
+
+    def test_kernel_without_solar(self):
+        """The numeric kernel drains flat consumption and never finds solar start."""
+        result = _simulate_hours(20, 10.0, 15.0, [1.0] * 24, [0.0] * 48, 22, 6)
+        min_soc, _min_hour, bws, dark, overnight, solar_start, tomorrow = result
+
+        assert min_soc == pytest.approx(0.0)
+        assert bws == pytest.approx(7.0)  # 20:00-22:00 inclusive drained
+        assert dark == 26.0  # 22:00 today through 23:00 tomorrow
+        assert overnight == pytest.approx(26.0)
+        assert solar_start is None
+        assert tomorrow == pytest.approx(24.0)
+
 
 class TestBuildSolarProfile:
     """Test the solar profile builder."""
@@ -1051,7 +1115,7 @@ class TestBuildSolarProfile:
 
         # At hour 20, no daylight hours (6-17) remain
         for h in range(20, 24):
-            assert profile.get((0, h), 0.0) == 0.0
+            assert profile[h] == 0.0
 
     def test_fallback_today_afternoon_solar(self):
         """At 14:00, remaining solar distributed across 14-17."""
@@ -1066,7 +1130,7 @@ class TestBuildSolarProfile:
         # Remaining: 10.0 - 5.0 = 5.0 kWh over hours 14, 15, 16, 17 = 4 hours
         expected_per_hour = 5.0 / 4
         for h in [14, 15, 16, 17]:
-            assert abs(profile.get((0, h), 0.0) - expected_per_hour) < 0.01
+            assert abs(profile[h] - expected_per_hour) < 0.01
 
     def test_fallback_tomorrow_distributed_6_to_17(self):
         """No hourly data → tomorrow solar spread over hours 6-17."""
@@ -1079,10 +1143,10 @@ class TestBuildSolarProfile:
 
         expected_per_hour = 12.0 / 12
         for h in range(6, 18):
-            assert abs(profile.get((1, h), 0.0) - expected_per_hour) < 0.01
+            assert abs(profile[24 + h] - expected_per_hour) < 0.01
         # No solar outside daylight
-        assert profile.get((1, 5), 0.0) == 0.0
-        assert profile.get((1, 18), 0.0) == 0.0
+        assert profile[24 + 5] == 0.0
+        assert profile[24 + 18] == 0.0
 
     def test_hourly_tomorrow_with_error_correction(self):
         """Hourly data with 40% error → each hour reduced by 40%."""
@@ -1095,9 +1159,9 @@ class TestBuildSolarProfile:
         profile, source = planner._build_solar_profile(_TEST_NOW)
 
         assert source == "forecast_solar"
-        assert abs(profile.get((1, 8), 0.0) - 2.0 * 0.6) < 0.01
-        assert abs(profile.get((1, 9), 0.0) - 3.0 * 0.6) < 0.01
-        assert abs(profile.get((1, 10), 0.0) - 4.0 * 0.6) < 0.01
+        assert abs(profile[24 + 8] - 2.0 * 0.6) < 0.01
+        assert abs(profile[24 + 9] - 3.0 * 0.6) < 0.01
+        assert abs(profile[24 + 10] - 4.0 * 0.6) < 0.01
 
     def test_hourly_today_used_when_available(self):
         """Today's hourly data used as-is (no error correction)."""
@@ -1109,9 +1173,9 @@ class TestBuildSolarProfile:
         profile, source = planner._build_solar_profile(_TEST_NOW)
 
         assert source == "forecast_solar"
-        assert profile.get((0, 14), 0.0) == 1.5
-        assert profile.get((0, 15), 0.0) == 1.0
-        assert profile.get((0, 16), 0.0) == 0.5
+        assert profile[14] == 1.5
+        assert profile[15] == 1.0
+        assert profile[16] == 0.5
 
 
 # --- Surplus Forecast tests ---
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from collections.abc import Mapping
+
 import pytest
 
 from price_analyzer import PriceAnalyzer, PriceSlot
@@ -10,7 +12,9 @@ from price_analyzer import PriceAnalyzer, PriceSlot
 class TestExtractNightPrices:
     """Test night price extraction from sensor attributes."""
 
-    def test_basic_extraction(self, price_analyzer: PriceAnalyzer, sample_prices: dict):
+    def test_basic_extraction(
+        self, price_analyzer: PriceAnalyzer, sample_prices: Mapping[str, float]
+    ):
         slots = price_analyzer.extract_night_prices(
             sample_prices, "2026-02-08", "2026-02-09"
         )
@@ -25,7 +29,9 @@ class TestExtractNightPrices:
         assert 6 not in hours
         assert 20 not in hours
 
-    def test_sorted_by_time(self, price_analyzer: PriceAnalyzer, sample_prices: dict):
+    def test_sorted_by_time(
+        self, price_analyzer: PriceAnalyzer, sample_prices: Mapping[str, float]
+    ):
         slots = price_analyzer.extract_night_prices(
             sample_prices, "2026-02-08", "2026-02-09"
         )
@@ -58,6 +64,37 @@ class TestExtractNightPrices:
         assert len(slots) == 1
         assert slots[0].price == 1.5
 
+    def test_from_index(self, price_analyzer: PriceAnalyzer, sample_prices: Mapping[str, float]):
+        """Selecting from a parsed index matches extracting from raw attributes."""
+        index = price_analyzer.index_prices(sample_prices)
+        assert price_analyzer.night_prices_from_index(
+            index, "2026-02-08", "2026-02-09"
+        ) == price_analyzer.extract_night_prices(sample_prices, "2026-02-08", "2026-02-09")
+
+    def test_index_keeps_every_entry_per_hour(self, price_analyzer: PriceAnalyzer):
+        prices = {
+            "2026-02-08T22:00:00+01:00": 2.0,
+            "2026-02-08T22:15:00+01:00": 9.0,
+            "unit_of_measurement": "Kč/kWh",
+        }
+        assert price_analyzer.index_prices(prices) == {"2026-02-08": {22: [2.0, 9.0]}}
+
+    def test_night_window_uses_first_entry_per_hour(self, price_analyzer: PriceAnalyzer):
+        prices = {
+            "2026-02-08T22:00:00+01:00": 2.0,
+            "2026-02-08T22:15:00+01:00": 9.0,
+        }
+        slots = price_analyzer.extract_night_prices(prices, "2026-02-08", "2026-02-09")
+        assert slots == [PriceSlot(hour=22, price=2.0)]
+
+    def test_index_accepts_space_separated_keys(self, price_analyzer: PriceAnalyzer):
+        prices = {
+            "2026-02-08 23:00": 1.8,
+            "2026-02-08T2x:00": 5.0,
+            "last_reset": "2026-02-08T00:00:00",
+        }
+        assert price_analyzer.index_prices(prices) == {"2026-02-08": {23: [1.8]}}
+
 
 class TestCalculateHoursNeeded:
     """Test charging hours calculation."""
@@ -74,6 +111,12 @@ class TestCalculateHoursNeeded:
         # 100 kWh at 5 kW = 20 hours → capped at 8 (window size 22-06)
         assert price_analyzer.calculate_hours_needed(100.0, 5.0) == 8
 
+    def test_max_capped_same_day_window(self):
+        # 01:00-05:00 does not wrap midnight → at most 4 hours
+        assert PriceAnalyzer(window_start_hour=1, window_end_hour=5).calculate_hours_needed(
+            100.0, 5.0
+        ) == 4
+
     def test_zero_kwh(self, price_analyzer: PriceAnalyzer):
         assert price_analyzer.calculate_hours_needed(0.0, 10.0) == 0
 
@@ -87,7 +130,7 @@ class TestCalculateHoursNeeded:
 class TestFindCheapestWindow:
     """Test cheapest window selection."""
 
-    def test_basic_window(self, price_analyzer: PriceAnalyzer, sample_prices: dict):
+    def test_basic_window(self, price_analyzer: PriceAnalyzer, sample_prices: Mapping[str, float]):
         slots = price_analyzer.extract_night_prices(
             sample_prices, "2026-02-08", "2026-02-09"
         )
@@ -102,7 +145,9 @@ class TestFindCheapestWindow:
         assert window.end_hour == 3
         assert window.window_hours == 3
 
-    def test_single_hour_window(self, price_analyzer: PriceAnalyzer, sample_prices: dict):
+    def test_single_hour_window(
+        self, price_analyzer: PriceAnalyzer, sample_prices: Mapping[str, float]
+    ):
         slots = price_analyzer.extract_night_prices(
             sample_prices, "2026-02-08", "2026-02-09"
         )
@@ -131,11 +176,68 @@ class TestFindCheapestWindow:
         # Can't form 3 contiguous hours across the gap
         assert window is None
 
+    def test_window_after_gap(self, price_analyzer: PriceAnalyzer):
+        """A contiguous run after a gap is still considered."""
+        slots = [
+            PriceSlot(hour=22, price=3.0),
+            PriceSlot(hour=23, price=3.0),
+            # Gap: hour 0 missing
+            PriceSlot(hour=1, price=2.0),
+            PriceSlot(hour=2, price=1.0),
+        ]
+        window = price_analyzer.find_cheapest_window(slots, 2)
+        assert window is not None
+        assert window.start_hour == 1
+        assert window.end_hour == 3
+        assert window.avg_price == pytest.approx(1.5)
+
+    def test_earliest_window_wins_on_exact_tie(self, price_analyzer: PriceAnalyzer):
+        """Windows with equal averages keep the earliest start hour."""
+        slots = [
+            PriceSlot(hour=22, price=1.1),
+            PriceSlot(hour=23, price=0.7),
+            PriceSlot(hour=0, price=1.3),
+            PriceSlot(hour=1, price=0.3),
+            PriceSlot(hour=2, price=0.3),
+        ]
+        window = price_analyzer.find_cheapest_window(slots, 1)
+        assert window is not None
+        assert window.start_hour == 1
+        assert window.avg_price == 0.3
+
+    def test_precomputed_prices(
+        self, price_analyzer: PriceAnalyzer, sample_prices: Mapping[str, float]
+    ):
+        """Passing the parallel price list gives the same window."""
+        slots = price_analyzer.extract_night_prices(
+            sample_prices, "2026-02-08", "2026-02-09"
+        )
+        prices = [s.price for s in slots]
+        window = price_analyzer.find_cheapest_window(slots, 3, prices=prices)
+        assert window == price_analyzer.find_cheapest_window(slots, 3)
+
+    def test_matches_brute_force_for_every_length(
+        self, price_analyzer: PriceAnalyzer, sample_prices: Mapping[str, float]
+    ):
+        """The rolling sum picks the same window as summing every slice."""
+        slots = price_analyzer.extract_night_prices(
+            sample_prices, "2026-02-08", "2026-02-09"
+        )
+        for hours in range(1, len(slots) + 1):
+            averages = [
+                sum(s.price for s in slots[i : i + hours]) / hours
+                for i in range(len(slots) - hours + 1)
+            ]
+            best = averages.index(min(averages))
+            window = price_analyzer.find_cheapest_window(slots, hours)
+            assert window.start_hour == slots[best].hour
+            assert window.avg_price == pytest.approx(averages[best], abs=1e-4)
+
 
 class TestFindCheapestHours:
     """Test finding N cheapest hours in a day."""
 
-    def test_basic(self, price_analyzer: PriceAnalyzer, sample_prices: dict):
+    def test_basic(self, price_analyzer: PriceAnalyzer, sample_prices: Mapping[str, float]):
         cheapest = price_analyzer.find_cheapest_hours(
             sample_prices, "2026-02-09", n=3
         )
@@ -143,12 +245,66 @@ class TestFindCheapestHours:
         # Should be sorted by price
         assert cheapest[0].price <= cheapest[1].price <= cheapest[2].price
 
-    def test_no_prices_for_date(self, price_analyzer: PriceAnalyzer, sample_prices: dict):
+    def test_from_index(self, price_analyzer: PriceAnalyzer, sample_prices: Mapping[str, float]):
+        index = price_analyzer.index_prices(sample_prices)
+        cheapest = price_analyzer.cheapest_hours_from_index(index, "2026-02-09", n=3)
+        assert [s.hour for s in cheapest] == [1, 2, 0]
+        assert cheapest == price_analyzer.find_cheapest_hours(
+            sample_prices, "2026-02-09", n=3
+        )
+
+    def test_no_prices_for_date(
+        self, price_analyzer: PriceAnalyzer, sample_prices: Mapping[str, float]
+    ):
         cheapest = price_analyzer.find_cheapest_hours(
             sample_prices, "2026-03-01", n=3
         )
         assert cheapest == []
 
+    def test_quarter_hour_slots_count_individually(self, price_analyzer: PriceAnalyzer):
+        prices = {
+            "2026-02-09T01:00:00+01:00": 3.0,
+            "2026-02-09T01:15:00+01:00": 1.0,
+            "2026-02-09T01:30:00+01:00": 1.1,
+            "2026-02-09T02:00:00+01:00": 1.2,
+        }
+        cheapest = price_analyzer.find_cheapest_hours(prices, "2026-02-09", n=3)
+        assert cheapest == [
+            PriceSlot(hour=1, price=1.0),
+            PriceSlot(hour=1, price=1.1),
+            PriceSlot(hour=2, price=1.2),
+        ]
+
+
+class TestAveragePrice:
+    """Test the daytime average over a parsed price index."""
+
+    def test_hourly_average(
+        self, price_analyzer: PriceAnalyzer, sample_prices: Mapping[str, float]
+    ):
+        index = price_analyzer.index_prices(sample_prices)
+        # Hours 8, 12 and 18 fall in 8-19: (4.0 + 3.8 + 4.5) / 3
+        avg = price_analyzer.average_price_from_index(index, "2026-02-09", 8, 19)
+        assert avg == pytest.approx(4.1)
+
+    def test_every_quarter_hour_counts(self, price_analyzer: PriceAnalyzer):
+        prices = {
+            "2026-02-09T08:00:00+01:00": 1.0,
+            "2026-02-09T08:15:00+01:00": 2.0,
+            "2026-02-09T08:30:00+01:00": 3.0,
+            "2026-02-09T08:45:00+01:00": 4.0,
+            "2026-02-09T19:00:00+01:00": 100.0,  # end hour excluded
+        }
+        index = price_analyzer.index_prices(prices)
+        avg = price_analyzer.average_price_from_index(index, "2026-02-09", 8, 19)
+        assert avg == pytest.approx(2.5)
+
+    def test_no_prices_in_range(
+        self, price_analyzer: PriceAnalyzer, sample_prices: Mapping[str, float]
+    ):
+        index = price_analyzer.index_prices(sample_prices)
+        assert price_analyzer.average_price_from_index(index, "2026-03-01", 8, 19) is None
+
 
 class TestClassifyPrice:
     """Test price classification."""
@@ -167,3 +323,15 @@ class TestClassifyPrice:
 
     def test_zero_threshold(self, price_analyzer: PriceAnalyzer):
         assert price_analyzer.classify_price(1.0, 0.0) == "Normal"
+
+    def test_band_edges_belong_to_upper_band(self, price_analyzer: PriceAnalyzer):
+        assert price_analyzer.classify_price(2.8, 4.0) == "Cheap"
+        assert price_analyzer.classify_price(4.0, 4.0) == "Normal"
+        assert price_analyzer.classify_price(6.0, 4.0) == "Expensive"
+
+    def test_threshold_change_moves_bands(self, price_analyzer: PriceAnalyzer):
+        assert price_analyzer.classify_price(5.0, 4.0) == "Normal"
+        assert price_analyzer.classify_price(5.0, 10.0) == "Very Cheap"
+
+    def test_negative_price_is_very_cheap(self, price_analyzer: PriceAnalyzer):
+        assert price_analyzer.classify_price(-0.5, 4.0) == "Very Cheap"
@@ -1,15 +1,48 @@
-"""Tests for storage-related data models — pure logic, no HA deps.
+"""Tests for storage — the ChargingSession model and SmartBatteryStore.
 
-The actual SmartBatteryStore class requires HA framework (homeassistant.helpers.storage).
-These tests verify the ChargingSession model used by storage.
-Full storage integration tests will be added in Phase 2 with the HA test framework.
+SmartBatteryStore runs against mocked HA Store objects, one per file.
 """
 
 from __future__ import annotations
 
+from unittest.mock import AsyncMock, MagicMock, patch
+
 import pytest
 
 from models import ChargingSession
+from smart_energy_manager import storage as _storage_mod
+from smart_energy_manager.const import (
+    BMS_CAPACITY_HISTORY_DAYS,
+    MORNING_SOC_HISTORY_DAYS,
+    SESSION_COST_HISTORY_DAYS,
+    SURPLUS_RUNTIME_HISTORY_DAYS,
+)
+from smart_energy_manager.storage import SAVE_DELAY, SmartBatteryStore
+
+
+def _make_file(stored=None):
+    """Create a mock HA Store whose async_load returns `stored`."""
+    file = MagicMock()
+    file.async_load = AsyncMock(return_value=stored)
+    file.async_save = AsyncMock()
+    file.async_remove = AsyncMock()
+    return file
+
+
+async def _make_store(stored=None, stored_state=None):
+    """Create and load a SmartBatteryStore; return it with its main and state files."""
+    main, state = _make_file(stored), _make_file(stored_state)
+    with patch.object(_storage_mod, "Store", side_effect=[main, state]):
+        store = SmartBatteryStore(MagicMock(), "entry1")
+    await store.async_load()
+    return store, main, state
+
+
+def _saved(file) -> dict:
+    """Return the document the last delayed save of `file` would write."""
+    data_func, delay = file.async_delay_save.call_args.args
+    assert delay == SAVE_DELAY
+    return data_func()
 
 
 class TestChargingSession:
@@ -101,3 +134,256 @@ class TestDefaultData:
         assert data["morning_soc_history"] == []
         assert data["session_cost_history"] == []
         assert data["bms_capacity_history"] == []
+
+
+class TestStoreFiles:
+    """Test the split between the history file and the state file."""
+
+    async def test_migrates_single_file_document(self):
+        """State keys from the old single-file layout load and get their own file."""
+        store, main, state = await _make_store(
+            stored={
+                "consumption_history": [12.0, 14.5],
+                "enabled": False,
+                "charging_state": "scheduled",
+                "current_schedule": {"start_hour": 1},
+            },
+        )
+        assert store.consumption_history == (12.0, 14.5)
+        assert store.enabled is False
+        assert store.charging_state == "scheduled"
+        assert store.current_schedule == {"start_hour": 1}
+
+        main.async_delay_save.assert_not_called()
+        state.async_delay_save.assert_called_once()
+        assert _saved(state) == {
+            "last_session": None,
+            "enabled": False,
+            "charging_state": "scheduled",
+            "current_schedule": {"start_hour": 1},
+            "surplus_load_states": {},
+        }
+
+    async def test_state_file_wins_over_main_document(self):
+        store, _main, state = await _make_store(
+            stored={"enabled": False, "charging_state": "scheduled"},
+            stored_state={"enabled": True, "charging_state": "charging"},
+        )
+        assert store.enabled is True
+        assert store.charging_state == "charging"
+        state.async_delay_save.assert_not_called()
+
+    async def test_loaded_history_is_read_only(self):
+        store, _main, _state = await _make_store(stored={"charge_history": [5.0]})
+        history = store.charge_history
+        with pytest.raises(TypeError):
+            history[0] = 1.0
+        with pytest.raises(AttributeError):
+            history.append(4.0)
+        assert store.charge_history == (5.0,)
+
+    async def test_empty_storage_loads_defaults(self):
+        store, main, _state = await _make_store()
+        assert store.consumption_history == ()
+        assert store.enabled is True
+        assert store.charging_state == "idle"
+        main.async_delay_save.assert_not_called()
+
+    @pytest.mark.parametrize(
+        ("setter", "key", "value"),
+        [
+            ("async_set_enabled", "enabled", False),
+            ("async_set_charging_state", "charging_state", "charging"),
+            ("async_set_current_schedule", "current_schedule", {"start_hour": 2}),
+            ("async_set_surplus_load_states", "surplus_load_states", {"boiler": "on"}),
+        ],
+    )
+    async def test_state_keys_go_to_state_file(self, setter, key, value):
+        store, main, state = await _make_store(stored_state={})
+        await getattr(store, setter)(value)
+        main.async_delay_save.assert_not_called()
+        saved = _saved(state)
+        assert saved[key] == value
+        assert "consumption_history" not in saved
+
+    async def test_last_session_goes_to_state_file(self):
+        store, main, state = await _make_store(stored_state={})
+        await store.async_set_last_session(ChargingSession(start_soc=20.0, end_soc=80.0))
+        main.async_delay_save.assert_not_called()
+        assert _saved(state)["last_session"]["end_soc"] == 80.0
+
+    @pytest.mark.parametrize(
+        ("setter", "key", "value"),
+        [
+            ("async_set_consumption_history", "consumption_history", [12.0]),
+            ("async_set_charge_history", "charge_history", [5.0]),
+            ("async_set_forecast_error_history", "forecast_error_history", [0.9]),
+            ("async_set_morning_soc_history", "morning_soc_history", [{"soc": 40}]),
+            ("async_set_session_cost_history", "session_cost_history", [{"cost": 9.5}]),
+            ("async_set_bms_capacity_history", "bms_capacity_history", [{"kwh": 17.2}]),
+            ("async_set_surplus_runtime_history", "surplus_runtime_history", [{"loads": {}}]),
+        ],
+    )
+    async def test_history_keys_go_to_main_file(self, setter, key, value):
+        store, main, state = await _make_store(stored_state={})
+        await getattr(store, setter)(value)
+        state.async_delay_save.assert_not_called()
+        saved = _saved(main)
+        assert saved[key] == tuple(value)
+        assert "enabled" not in saved
+
+    async def test_async_save_writes_both_files(self):
+        store, main, state = await _make_store(stored_state={})
+        await store.async_save()
+        assert set(main.async_save.call_args.args[0]) == {
+            "consumption_history", "charge_history", "forecast_error_history",
+            "morning_soc_history", "session_cost_history", "bms_capacity_history",
+            "surplus_runtime_history",
+        }
+        assert set(state.async_save.call_args.args[0]) == {
+            "last_session", "enabled", "charging_state", "current_schedule",
+            "surplus_load_states",
+        }
+
+    async def test_async_remove_deletes_both_files(self):
+        store, main, state = await _make_store()
+        await store.async_remove()
+        main.async_remove.assert_awaited_once()
+        state.async_remove.assert_awaited_once()
+
+
+class TestDelayedSave:
+    """Test write coalescing and the unload flush."""
+
+    async def test_setter_schedules_delayed_save(self):
+        store, main, _state = await _make_store(stored_state={})
+        await store.async_set_charge_history([5.0])
+        await store.async_set_charge_history([5.0, 4.0])
+        # Each call reschedules the same delayed write; nothing is saved yet
+        assert main.async_delay_save.call_count == 2
+        main.async_save.assert_not_called()
+        assert _saved(main)["charge_history"] == (5.0, 4.0)
+
+    async def test_equal_value_does_not_save(self):
+        store, main, state = await _make_store(
+            stored={"charge_history": [5.0]},
+            stored_state={"current_schedule": {"start_hour": 1}},
+        )
+        await store.async_set_charge_history([5.0])
+        await store.async_set_current_schedule({"start_hour": 1})
+        main.async_delay_save.assert_not_called()
+        state.async_delay_save.assert_not_called()
+
+    async def test_same_mutated_object_still_saves(self):
+        store, _main, state = await _make_store(stored_state={"surplus_load_states": {}})
+        states = store.surplus_load_states
+        states["boiler"] = "on"
+        await store.async_set_surplus_load_states(states)
+        state.async_delay_save.assert_called_once()
+        assert _saved(state)["surplus_load_states"] == {"boiler": "on"}
+
+    async def test_async_save_flushes_pending_writes(self):
+        store, main, _state = await _make_store(stored_state={})
+        await store.async_set_charge_history([5.0])
+        await store.async_save()
+        main.async_save.assert_awaited_once()
+        assert main.async_save.call_args.args[0]["charge_history"] == (5.0,)
+
+    async def test_unload_flushes_store(self):
+        from smart_energy_manager import async_unload_entry
+        from smart_energy_manager.const import DOMAIN
+
+        coordinator = MagicMock()
+        coordinator.store.async_save = AsyncMock()
+        entry = MagicMock(entry_id="entry1")
+        hass = MagicMock()
+        hass.config_entries.async_unload_platforms = AsyncMock(return_value=True)
+        hass.data = {DOMAIN: {"entry1": coordinator}}
+
+        assert await async_unload_entry(hass, entry) is True
+        coordinator.store.async_save.assert_awaited_once()
+        assert "entry1" not in hass.data[DOMAIN]
+
+
+class TestBoundedHistory:
+    """Test prepending to the bounded histories."""
+
+    @pytest.mark.parametrize(
+        ("adder", "key", "limit"),
+        [
+            ("async_add_morning_soc", "morning_soc_history", MORNING_SOC_HISTORY_DAYS),
+            ("async_add_session_cost", "session_cost_history", SESSION_COST_HISTORY_DAYS),
+            ("async_add_bms_capacity", "bms_capacity_history", BMS_CAPACITY_HISTORY_DAYS),
+            ("async_add_surplus_runtime", "surplus_runtime_history", SURPLUS_RUNTIME_HISTORY_DAYS),
+        ],
+    )
+    async def test_add_drops_oldest_at_limit(self, adder, key, limit):
+        full = [{"day": i} for i in range(limit)]
+        store, main, _state = await _make_store(stored={key: full}, stored_state={})
+        await getattr(store, adder)({"day": "new"})
+
+        history = getattr(store, key)
+        assert len(history) == limit
+        assert history[0] == {"day": "new"}
+        assert history[1:] == tuple(full[:-1])
+        assert _saved(main)[key] is history
+        # The loaded list is copied, not mutated
+        assert len(full) == limit
+        assert full[0] == {"day": 0}
+
+    async def test_add_below_limit_keeps_everything(self):
+        store, _main, _state = await _make_store(
+            stored={"session_cost_history": [{"cost": 1.0}]}, stored_state={}
+        )
+        await store.async_add_session_cost({"cost": 2.0})
+        assert store.session_cost_history == ({"cost": 2.0}, {"cost": 1.0})
+
+    async def test_set_truncates_to_limit(self):
+        store, _main, _state = await _make_store(stored_state={})
+        await store.async_set_morning_soc_history(
+            [{"day": i} for i in range(MORNING_SOC_HISTORY_DAYS + 5)]
+        )
+        assert len(store.morning_soc_history) == MORNING_SOC_HISTORY_DAYS
+
+
+class TestLastSessionCache:
+    """Test the cached ChargingSession built from the stored dict."""
+
+    async def test_no_session(self):
+        store, _main, _state = await _make_store()
+        assert store.last_session is None
+
+    async def test_repeated_reads_return_same_object(self):
+        store, _main, _state = await _make_store(
+            stored_state={"last_session": {"start_soc": 20.0, "end_soc": 80.0}}
+        )
+        session = store.last_session
+        assert session.start_soc == 20.0
+        assert session.end_soc == 80.0
+        assert store.last_session is session
+
+    async def test_replacing_session_invalidates_cache(self):
+        store, _main, _state = await _make_store(
+            stored_state={"last_session": {"start_soc": 20.0, "end_soc": 80.0}}
+        )
+        old = store.last_session
+        await store.async_set_last_session(
+            ChargingSession(start_soc=30.0, end_soc=90.0, result="Target reached")
+        )
+        new = store.last_session
+        assert new is not old
+        assert new.start_soc == 30.0
+        assert new.end_soc == 90.0
+        assert new.result == "Target reached"
+        assert store.last_session is new
+
+    async def test_equal_session_keeps_cached_object(self):
+        stored = {
+            "start_soc": 20.0, "end_soc": 80.0, "start_time": "", "end_time": "",
+            "avg_price": 0.0, "result": "",
+        }
+        store, _main, state = await _make_store(stored_state={"last_session": stored})
+        cached = store.last_session
+        await store.async_set_last_session(ChargingSession(start_soc=20.0, end_soc=80.0))
+        state.async_delay_save.assert_not_called()
+        assert store.last_session is cached
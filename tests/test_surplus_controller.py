@@ -2,39 +2,10 @@
 
 from __future__ import annotations
 
-import sys
 import time
-from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
-
-# Mock HA modules before importing the package
-for mod_name in [
-    "homeassistant",
-    "homeassistant.core",
-    "homeassistant.config_entries",
-    "homeassistant.helpers",
-    "homeassistant.helpers.update_coordinator",
-    "homeassistant.helpers.storage",
-    "homeassistant.helpers.entity_platform",
-    "homeassistant.helpers.selector",
-    "homeassistant.helpers.event",
-    "homeassistant.components",
-    "homeassistant.components.switch",
-    "homeassistant.components.sensor",
-    "homeassistant.components.binary_sensor",
-    "homeassistant.components.number",
-    "homeassistant.data_entry_flow",
-    "homeassistant.util",
-    "homeassistant.util.dt",
-    "voluptuous",
-]:
-    sys.modules.setdefault(mod_name, MagicMock())
-
-_COMPONENTS_DIR = Path(__file__).parent.parent / "custom_components"
-sys.path.insert(0, str(_COMPONENTS_DIR))
-
 from smart_energy_manager.models import SurplusLoadConfig, SurplusLoadState
 from smart_energy_manager.surplus_controller import (
     SurplusLoadController,
@@ -184,7 +155,6 @@ class TestTrueSurplus:
 class TestSurplusTick:
     """Test the main tick logic."""
 
-    @pytest.mark.asyncio
     async def test_turn_on_when_surplus(self):
         """Turn on load when SOC high and surplus exceeds power + margin."""
         hass = _make_hass(grid_export_kw=3.0, switch_states={"switch.water_heater": "off"})
@@ -198,7 +168,6 @@ class TestSurplusTick:
             "switch", "turn_on", {"entity_id": "switch.water_heater"}
         )
 
-    @pytest.mark.asyncio
     async def test_no_turn_on_when_soc_low(self):
         """Don't turn on when SOC below threshold."""
         hass = _make_hass(grid_export_kw=5.0, switch_states={"switch.water_heater": "off"})
@@ -210,7 +179,6 @@ class TestSurplusTick:
 
         hass.services.async_call.assert_not_called()
 
-    @pytest.mark.asyncio
     async def test_no_turn_on_when_surplus_below_margin(self):
         """Don't turn on when surplus doesn't cover the ON margin."""
         hass = _make_hass(grid_export_kw=0.2, switch_states={"switch.water_heater": "off"})
@@ -223,7 +191,6 @@ class TestSurplusTick:
         # 0.2 < 0.3 (margin_on) -> no turn on
         hass.services.async_call.assert_not_called()
 
-    @pytest.mark.asyncio
     async def test_turn_off_when_soc_drops(self):
         """Turn off when SOC drops below off threshold (after 3 consecutive ticks)."""
         hass = _make_hass(grid_export_kw=0.5, switch_states={"switch.water_heater": "on"})
@@ -241,7 +208,6 @@ class TestSurplusTick:
         )
         assert not ctrl._states["test-water-heater"].is_running
 
-    @pytest.mark.asyncio
     async def test_stay_on_when_true_surplus_ok(self):
         """Stay on when true surplus (accounting for own consumption) is sufficient."""
         # Grid export is 0.5 kW, but load is running (2.3 kW)
@@ -256,7 +222,6 @@ class TestSurplusTick:
 
         hass.services.async_call.assert_not_called()
 
-    @pytest.mark.asyncio
     async def test_turn_off_when_true_surplus_low(self):
         """Turn off when true surplus drops below threshold (after 3 ticks)."""
         # Grid export is -1.5 kW (importing), load is running (2.3 kW)
@@ -276,7 +241,6 @@ class TestSurplusTick:
         )
         assert not ctrl._states["test-water-heater"].is_running
 
-    @pytest.mark.asyncio
     async def test_anti_flap_blocks_switch(self):
         """Anti-flap prevents switching within min_switch_interval."""
         hass = _make_hass(grid_export_kw=3.0, switch_states={"switch.water_heater": "off"})
@@ -290,7 +254,6 @@ class TestSurplusTick:
 
         hass.services.async_call.assert_not_called()
 
-    @pytest.mark.asyncio
     async def test_priority_ordering(self):
         """Higher priority load gets surplus first; second load turns on if margin met."""
         # 3.0 kW surplus, water heater margin 0.3 -> on, remaining = 3.0 - 2.3 = 0.7
@@ -311,7 +274,6 @@ class TestSurplusTick:
         assert calls[0][0] == ("switch", "turn_on", {"entity_id": "switch.water_heater"})
         assert calls[1][0] == ("switch", "turn_on", {"entity_id": "switch.floor_heating"})
 
-    @pytest.mark.asyncio
     async def test_both_loads_when_enough_surplus(self):
         """Both loads turn on when surplus covers both."""
         # 5.0 kW surplus, water heater needs 2.6, remaining 2.7, floor heating needs 1.8
@@ -328,7 +290,6 @@ class TestSurplusTick:
         calls = hass.services.async_call.call_args_list
         assert len(calls) == 2
 
-    @pytest.mark.asyncio
     async def test_grid_export_sensor_unavailable(self):
         """Skip tick when grid export sensor is unavailable."""
         hass = MagicMock()
@@ -342,7 +303,6 @@ class TestSurplusTick:
 
         hass.services.async_call.assert_not_called()
 
-    @pytest.mark.asyncio
     async def test_watts_conversion(self):
         """Grid export in W is converted to kW."""
         hass = _make_hass(grid_export_kw=3000, grid_uom="W", switch_states={"switch.water_heater": "off"})
@@ -414,7 +374,6 @@ class TestSensorData:
 class TestMidnight:
     """Test midnight reset."""
 
-    @pytest.mark.asyncio
     async def test_midnight_records_runtime(self):
         hass = _make_hass(switch_states={"switch.water_heater": "on"})
         coord = _make_coordinator(surplus_loads=[WATER_HEATER_LOAD])
@@ -431,7 +390,6 @@ class TestMidnight:
         # Runtime reset
         assert ctrl._states["test-water-heater"].daily_runtime_seconds == 0.0
 
-    @pytest.mark.asyncio
     async def test_midnight_resets_predictive_state(self):
         """Midnight resets predictive approval for next day."""
         load = {**FLOOR_HEATING_LOAD, "mode": "predictive", "schedule_start_hour": 5, "schedule_end_hour": 8}
@@ -549,7 +507,6 @@ class TestPredictiveTick:
         from datetime import datetime
         return datetime(2026, 3, 9, hour, minute, 0)
 
-    @pytest.mark.asyncio
     async def test_predictive_turn_on_at_schedule_start(self):
         """Approved predictive load turns on when schedule starts."""
         hass = _make_hass(
@@ -570,7 +527,6 @@ class TestPredictiveTick:
                  if c[0][1] == "turn_on" and c[0][2]["entity_id"] == "switch.floor_heating"]
         assert len(calls) == 1
 
-    @pytest.mark.asyncio
     async def test_predictive_not_turned_on_if_not_approved(self):
         """Predictive load stays off if not approved."""
         hass = _make_hass(
@@ -591,7 +547,6 @@ class TestPredictiveTick:
                  if c[0][2].get("entity_id") == "switch.floor_heating"]
         assert len(calls) == 0
 
-    @pytest.mark.asyncio
     async def test_predictive_turn_off_at_schedule_end(self):
         """Running predictive load turns off when schedule ends."""
         hass = _make_hass(
@@ -612,7 +567,6 @@ class TestPredictiveTick:
                  if c[0][1] == "turn_off" and c[0][2]["entity_id"] == "switch.floor_heating"]
         assert len(calls) == 1
 
-    @pytest.mark.asyncio
     async def test_predictive_does_not_affect_reactive(self):
         """Reactive loads still work normally alongside predictive loads."""
         hass = _make_hass(